@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 from typing import Callable, Deque, Dict, List, Optional
 
 import httpx
+import numpy as np
 
 from multiai.collectors.onchain import ltc_mempool
 from multiai.collectors.rotate import RollingParquetWriter
@@ -43,20 +44,63 @@ class WhaleEvent:
 
 
 class WhaleRingBuffer:
+    """Window of whale events plus a contiguous float64 array of their values.
+
+    ``_values[_start:_end]`` mirrors ``_events`` slot for slot so per-tick
+    aggregates are numpy reductions instead of Python loops over events.
+    """
+
     def __init__(self, window_seconds: int = WINDOW_SECONDS_DEFAULT) -> None:
         self.window_ms = window_seconds * 1000
         self._events: Deque[WhaleEvent] = deque()
+        self._values = np.empty(64, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        # Absolute sequence number of ``_values[0]`` and of each live txid.
+        self._base_seq = 0
+        self._seq_by_txid: Dict[str, int] = {}
+
+    def _make_room(self) -> None:
+        live = self._end - self._start
+        if self._start and live <= len(self._values) // 2:
+            self._values[:live] = self._values[self._start:self._end]
+        else:
+            grown = np.empty(2 * len(self._values), dtype=np.float64)
+            grown[:live] = self._values[self._start:self._end]
+            self._values = grown
+        self._base_seq += self._start
+        self._start, self._end = 0, live
 
     def add(self, event: WhaleEvent) -> None:
+        if self._end == len(self._values):
+            self._make_room()
+        self._values[self._end] = event.value_ltc_total
+        self._seq_by_txid[event.txid] = self._base_seq + self._end
+        self._end += 1
         self._events.append(event)
 
+    def set_value(self, event: WhaleEvent, value: float) -> None:
+        event.value_ltc_total = value
+        seq = self._seq_by_txid.get(event.txid)
+        if seq is not None:
+            self._values[seq - self._base_seq] = value
+
     def prune(self, now_ms: int) -> List[WhaleEvent]:
         cutoff = now_ms - self.window_ms
         removed: List[WhaleEvent] = []
         while self._events and self._events[0].timestamp_ms < cutoff:
-            removed.append(self._events.popleft())
+            event = self._events.popleft()
+            self._seq_by_txid.pop(event.txid, None)
+            self._start += 1
+            removed.append(event)
         return removed
 
+    def values(self) -> np.ndarray:
+        """Read-only view of the live event values, oldest first."""
+        view = self._values[self._start:self._end]
+        view.flags.writeable = False
+        return view
+
     def snapshot(self) -> List[WhaleEvent]:
         return list(self._events)
 
@@ -140,7 +184,7 @@ class WhaleTracker:
                 self._event_writer.write_row(event.to_row())
         else:
             # Update totals if they changed and enrich block height when known.
-            event.value_ltc_total = max(event.value_ltc_total, total_value)
+            self._buffer.set_value(event, max(event.value_ltc_total, total_value))
             if block_height is not None and block_height >= 0:
                 new_height = int(block_height)
                 height_changed = event.block_height != new_height
@@ -176,13 +220,16 @@ class WhaleTracker:
         for ev in removed:
             self._events_by_txid.pop(ev.txid, None)
             self._first_seen.pop(ev.txid, None)
-        events = self._buffer.snapshot()
-        count = len(events)
-        total_value = sum(e.value_ltc_total for e in events)
+        values = self._buffer.values()
+        count = len(values)
+        if count:
+            total_value = values.sum()
+            max_value = values.max()
+            k = min(self.top_n, count)
+            top_sum = np.partition(values, count - k)[count - k:].sum()
+        else:
+            total_value = max_value = top_sum = 0.0
         avg_value = total_value / count if count else 0.0
-        max_value = max((e.value_ltc_total for e in events), default=0.0)
-        top_values = sorted((e.value_ltc_total for e in events), reverse=True)
-        top_sum = sum(top_values[: self.top_n]) if top_values else 0.0
         metrics = {
             "timestamp": grid_ts,
             "whale_tx_count_10m": int(count),
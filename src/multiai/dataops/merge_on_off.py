@@ -1,7 +1,10 @@
 import os
-from typing import Union
+from typing import Tuple, Union
+import numpy as np
 import pandas as pd
 
+DF_BACKEND_ENV = "MULTIAI_DF_BACKEND"
+
 
 def _ensure_df(obj: Union[str, pd.DataFrame]) -> pd.DataFrame:
     if isinstance(obj, str):
@@ -9,6 +12,53 @@ def _ensure_df(obj: Union[str, pd.DataFrame]) -> pd.DataFrame:
     return obj.copy()
 
 
+def _join(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    on: str,
+    how: str = "inner",
+    suffixes: Tuple[str, str] = ("_x", "_y"),
+) -> pd.DataFrame:
+    """Join two frames on ``on``, via Polars when ``MULTIAI_DF_BACKEND=polars``.
+
+    Overlapping columns are renamed with ``suffixes`` up front so both
+    backends return the same column names and order.
+    """
+    if os.environ.get(DF_BACKEND_ENV, "pandas").strip().lower() != "polars":
+        return pd.merge(left, right, on=on, how=how, suffixes=suffixes)
+
+    import polars as pl
+
+    overlap = (set(left.columns) & set(right.columns)) - {on}
+    if overlap:
+        left = left.rename(columns={c: f"{c}{suffixes[0]}" for c in overlap})
+        right = right.rename(columns={c: f"{c}{suffixes[1]}" for c in overlap})
+    # Polars does not promise an output row order; restore pandas' (left rows
+    # in order, then matching right rows in order) since callers ffill after.
+    lrow, rrow = "__left_row", "__right_row"
+    joined = (
+        pl.from_pandas(left, rechunk=False, nan_to_null=False).with_row_index(lrow)
+        .join(
+            pl.from_pandas(right, rechunk=False, nan_to_null=False).with_row_index(rrow),
+            on=on, how=how, coalesce=True,
+        )
+        .sort([lrow, rrow], nulls_last=True)
+        .drop([lrow, rrow])
+    )
+    return joined.to_pandas()
+
+
+def _strictly_increasing(col: pd.Series) -> bool:
+    """True if ``col`` is sorted with no repeats, via one ``np.diff`` over its int64/numeric values."""
+    values = getattr(col.array, "asi8", None)
+    if values is None:
+        if not pd.api.types.is_numeric_dtype(col.dtype):
+            return False
+        values = col.to_numpy()
+    diffs = np.diff(values)
+    return bool(diffs.size == 0 or diffs.min() > 0)
+
+
 def _looks_like_path(val: Union[str, os.PathLike]) -> bool:
     s = str(val)
     return s.endswith(".parquet") or ("/" in s) or ("\\" in s)
@@ -61,12 +111,13 @@ def merge_on_off(
     if whale_df is not None and ts_col not in whale_df.columns:
         raise ValueError(f"whale frame missing '{ts_col}'")
 
-    merged = pd.merge(off_df, on_df, on=ts_col, how="inner", suffixes=("_off", "_on"))
+    merged = _join(off_df, on_df, on=ts_col, how="inner", suffixes=("_off", "_on"))
 
     if whale_df is not None:
-        whale_df = whale_df.drop_duplicates(subset=[ts_col], keep="last")
-        whale_df = whale_df.sort_values(ts_col)
-        merged = pd.merge(merged, whale_df, on=ts_col, how="left")
+        if not _strictly_increasing(whale_df[ts_col]):
+            whale_df = whale_df.drop_duplicates(subset=[ts_col], keep="last")
+            whale_df = whale_df.sort_values(ts_col)
+        merged = _join(merged, whale_df, on=ts_col, how="left")
         whale_cols = [c for c in whale_df.columns if c != ts_col]
         for col in whale_cols:
             if col.startswith("whale_"):
@@ -75,11 +126,16 @@ def merge_on_off(
             merged["threshold_ltc_effective"] = merged["threshold_ltc_effective"].ffill()
             merged["threshold_ltc_effective"] = merged["threshold_ltc_effective"].fillna(0.0)
 
-    if merged.isna().any().any():
-        bad = merged.columns[merged.isna().any()].tolist()
+    na_cols = merged.isna().any()
+    if na_cols.any():
+        bad = merged.columns[na_cols].tolist()
         raise ValueError(f"Merged frame contains NaN in columns: {bad}")
 
-    merged = merged.sort_values(ts_col).drop_duplicates(subset=[ts_col], keep="last").reset_index(drop=True)
+    # Strictly increasing keys are already sorted and duplicate-free.
+    if _strictly_increasing(merged[ts_col]):
+        merged = merged.reset_index(drop=True)
+    else:
+        merged = merged.sort_values(ts_col).drop_duplicates(subset=[ts_col], keep="last").reset_index(drop=True)
 
     if out_path:
         os.makedirs(os.path.dirname(str(out_path)) or ".", exist_ok=True)
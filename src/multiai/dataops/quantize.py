@@ -1,10 +1,35 @@
+import numpy as np
 import pandas as pd
 from typing import Union
 
+from multiai.tools.jit import njit
+
+_SEC_NS = 1_000_000_000
+
+
 def _ensure_df(obj: Union[str, pd.DataFrame]) -> pd.DataFrame:
     if isinstance(obj, str):
         return pd.read_parquet(obj)
-    return obj.copy()
+    return obj
+
+
+@njit(cache=True, nogil=True)
+def _last_per_second(ts_ns):
+    """Walk sorted nanosecond stamps; return (row of last stamp, ceil-second ns) per bucket."""
+    n = ts_ns.shape[0]
+    rows = np.empty(n, np.int64)
+    secs = np.empty(n, np.int64)
+    k = -1
+    cur = 0
+    for i in range(n):
+        sec = -((-ts_ns[i]) // _SEC_NS)
+        if k < 0 or sec != cur:
+            k += 1
+            cur = sec
+            secs[k] = sec * _SEC_NS
+        rows[k] = i
+    return rows[: k + 1], secs[: k + 1]
+
 
 def quantize_to_1s(df_or_path: Union[str, pd.DataFrame], ts_col: str = "timestamp") -> pd.DataFrame:
     """Forward-round timestamps to next whole second and keep only the latest row per 1s bin."""
@@ -16,19 +41,11 @@ def quantize_to_1s(df_or_path: Union[str, pd.DataFrame], ts_col: str = "timestam
     if ts.isna().any():
         raise ValueError("Found unparsable timestamps")
 
-    ns = ts.astype("int64")
-    sec = 1_000_000_000
-    ceil_ns = ((ns // sec) + (ns % sec > 0)) * sec
-    qsec = pd.to_datetime(ceil_ns, unit="ns", utc=True).dt.tz_convert(None)
-
-    df = df.copy()
-    df["_qsec"] = qsec
-    df["_orig_ts"] = ts.dt.tz_convert(None)
-    df = df.sort_values(["_qsec", "_orig_ts"])
-    dedup = df.drop_duplicates(subset=["_qsec"], keep="last")
+    ns = ts.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]").view("i8")
+    order = np.argsort(ns, kind="stable")
+    rows, secs = _last_per_second(ns[order])
 
     # Drop original timestamp and replace with quantized
-    dedup = dedup.drop(columns=[ts_col, "_orig_ts"])
-    dedup = dedup.rename(columns={"_qsec": ts_col})
-    dedup = dedup.sort_values(ts_col).reset_index(drop=True)
-    return dedup
+    out = df.drop(columns=[ts_col]).iloc[order[rows]].reset_index(drop=True)
+    out[ts_col] = secs.view("datetime64[ns]")
+    return out
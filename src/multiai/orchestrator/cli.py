@@ -2,7 +2,7 @@
 import sys, json, traceback, os, inspect
 from datetime import datetime, timezone
 from importlib import import_module
-from .queue import dequeue, length, enqueue
+from .queue import dequeue, length, enqueue_many
 from . import state as st
 from multiai.paper_trading import SessionConfig, run as run_paper_session
 
@@ -127,8 +127,8 @@ def handle_build_features(payload):
     if not price_col:
         df_cols = []
         try:
-            import pandas as _pd
-            df_cols = [c.lower() for c in _pd.read_parquet(merged_path, columns=None).columns]
+            import pyarrow.parquet as _pq
+            df_cols = [c.lower() for c in _pq.read_schema(merged_path).names]
         except Exception:
             df_cols = []
         preferred = ["mid_price","weighted_mid_price","trade_price","price","close","last_price"]
@@ -474,7 +474,7 @@ def next_steps():
         return steps
     return steps
 
-def handle(task):
+def _dispatch(task):
     t = (task or {}).get("type")
     payload = (task or {}).get("payload", {})
     fn = DISPATCH.get(t)
@@ -484,15 +484,37 @@ def handle(task):
     try:
         res = fn(payload)
         print("ok", json.dumps({"type": t, "result": str(res)}, ensure_ascii=False))
-        for nt, np in next_steps():
-            enqueue(nt, np)
-            print("enqueued", json.dumps({"type": nt, "payload": np}, ensure_ascii=False))
         return True
     except Exception as e:
         print("error", t, str(e))
         traceback.print_exc()
         return False
 
+def _enqueue_next_steps():
+    try:
+        steps = next_steps()
+        enqueue_many(steps)
+    except Exception as e:
+        print("error", "next_steps", str(e))
+        traceback.print_exc()
+        return False
+    for nt, np in steps:
+        print("enqueued", json.dumps({"type": nt, "payload": np}, ensure_ascii=False))
+    return True
+
+def handle_many(tasks):
+    """Run ``tasks`` in order, then enqueue the follow-up steps once for the batch.
+
+    Returns one bool per task, as :func:`handle` would.
+    """
+    results = [_dispatch(task) for task in tasks]
+    if any(results) and not _enqueue_next_steps():
+        results = [False] * len(results)
+    return results
+
+def handle(task):
+    return handle_many([task])[0]
+
 def run_once():
     task = dequeue()
     if task is None:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import base64
+import functools
 import json
 import os
 import subprocess
@@ -7,7 +8,7 @@ import tempfile
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 from urllib.parse import quote
 
 import httpx
@@ -52,6 +53,7 @@ class ClientSettings:
 
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
+_REPO_ROOT_PREFIX = str(REPO_ROOT) + os.sep
 DEFAULT_BASE = "main"
 DEFAULT_PUSH_METHOD = "PUT"
 DEFAULT_TIMEOUT = 30.0
@@ -115,8 +117,61 @@ def push_branch(
     _ensure_pull_request(branch, pr_title, pr_body, settings, token, owner, repo, head_owner)
 
 
+# (attribute, environment variable, config path, config default, coercion)
+_SETTINGS_SPEC: Tuple[Tuple[str, str, Tuple[str, ...], Any, Callable[[Any], Any]], ...] = (
+    ("base", "MULTIAI_GITHUB_BASE", ("base",), DEFAULT_BASE, lambda v: v or DEFAULT_BASE),
+    ("head_owner", "MULTIAI_GITHUB_HEAD_OWNER", ("head_owner",), None, lambda v: v),
+    ("push_url", "MULTIAI_GITHUB_PUSH_URL", ("push", "url"), None, lambda v: v),
+    ("push_remote", "MULTIAI_GITHUB_PUSH_REMOTE", ("push", "remote"), None, lambda v: v),
+    ("force_push", "MULTIAI_GITHUB_FORCE_PUSH", ("push", "force"), True, lambda v: _coerce_bool(v, default=True)),
+    ("token", "MULTIAI_GITHUB_TOKEN", ("token",), None, lambda v: v),
+    ("api_url", "MULTIAI_GITHUB_API_URL", ("api_url",), "https://api.github.com", lambda v: v),
+    ("git_server", "MULTIAI_GITHUB_SERVER_URL", ("git_server",), "https://github.com", lambda v: v),
+    (
+        "http_timeout",
+        "MULTIAI_GITHUB_HTTP_TIMEOUT",
+        ("http_timeout",),
+        DEFAULT_TIMEOUT,
+        lambda v: _coerce_float(v, default=DEFAULT_TIMEOUT),
+    ),
+    ("user_agent", "MULTIAI_GITHUB_USER_AGENT", ("user_agent",), "multi-ai-orchestrator", lambda v: v),
+    ("dry_run", "MULTIAI_GITHUB_DRY_RUN", ("dry_run",), False, lambda v: _coerce_bool(v, default=False)),
+    ("pr_title_template", "MULTIAI_GITHUB_PR_TITLE_TEMPLATE", ("pr", "title_template"), None, lambda v: v),
+    ("pr_body_template", "MULTIAI_GITHUB_PR_BODY_TEMPLATE", ("pr", "body_template"), None, lambda v: v),
+    ("pr_body_path", "MULTIAI_GITHUB_PR_BODY_PATH", ("pr", "body_path"), None, lambda v: v),
+    ("pr_body_literal", "MULTIAI_GITHUB_PR_BODY", ("pr", "body"), None, lambda v: v),
+    ("attestation_upload_url", "MULTIAI_ATTESTATION_UPLOAD_URL", ("attestation_upload", "url"), None, lambda v: v),
+    (
+        "attestation_upload_method",
+        "MULTIAI_ATTESTATION_UPLOAD_METHOD",
+        ("attestation_upload", "method"),
+        DEFAULT_PUSH_METHOD,
+        lambda v: (v or DEFAULT_PUSH_METHOD).upper(),
+    ),
+    (
+        "attestation_upload_token",
+        "MULTIAI_ATTESTATION_UPLOAD_TOKEN",
+        ("attestation_upload", "token"),
+        None,
+        lambda v: v,
+    ),
+    ("app_id", "MULTIAI_GITHUB_APP_ID", ("app", "id"), None, lambda v: v),
+    ("installation_id", "MULTIAI_GITHUB_INSTALLATION_ID", ("app", "installation_id"), None, lambda v: v),
+)
+
+
+def _walk(data: Any, keys: Tuple[str, ...], default: Any = None) -> Any:
+    cur: Any = data
+    for key in keys:
+        if not isinstance(cur, Mapping) or key not in cur:
+            return default
+        cur = cur[key]
+    return cur
+
+
 def _load_settings() -> ClientSettings:
-    config_path = os.environ.get("MULTIAI_GITHUB_CONFIG")
+    env = os.environ
+    config_path = env.get("MULTIAI_GITHUB_CONFIG")
     config_data: Dict[str, Any] = {}
     if config_path:
         path = Path(config_path)
@@ -127,57 +182,21 @@ def _load_settings() -> ClientSettings:
         except json.JSONDecodeError as exc:
             raise GitHubAppError(f"Failed to parse GitHub config file '{config_path}': {exc}") from exc
 
-    def _cfg(*keys: str, default: Any = None) -> Any:
-        cur: Any = config_data
-        for key in keys:
-            if not isinstance(cur, Mapping) or key not in cur:
-                return default
-            cur = cur[key]
-        return cur
-
-    def _env(name: str, fallback: Any = None) -> Any:
-        return os.environ.get(name, fallback)
-
-    repository = _env(
-        "MULTIAI_GITHUB_REPOSITORY",
-        _cfg("repository") or _derive_repository_from_git(),
-    )
+    repository = env.get("MULTIAI_GITHUB_REPOSITORY")
+    if repository is None:
+        repository = _walk(config_data, ("repository",)) or _derive_repository_from_git()
     if not repository:
         raise GitHubAppError(
             "Missing repository configuration; set MULTIAI_GITHUB_REPOSITORY or provide a config file."
         )
-    repository = repository.strip()
-
-    base = _env("MULTIAI_GITHUB_BASE", _cfg("base", default=DEFAULT_BASE)) or DEFAULT_BASE
-    head_owner = _env("MULTIAI_GITHUB_HEAD_OWNER", _cfg("head_owner"))
 
-    push_url = _env("MULTIAI_GITHUB_PUSH_URL", _cfg("push", "url"))
-    push_remote = _env("MULTIAI_GITHUB_PUSH_REMOTE", _cfg("push", "remote"))
-    force_push = _coerce_bool(_env("MULTIAI_GITHUB_FORCE_PUSH", _cfg("push", "force", default=True)), default=True)
+    values: Dict[str, Any] = {"repository": repository.strip()}
+    for attr, env_name, cfg_path, default, coerce in _SETTINGS_SPEC:
+        values[attr] = coerce(env.get(env_name, _walk(config_data, cfg_path, default)))
 
-    token = _env("MULTIAI_GITHUB_TOKEN", _cfg("token"))
-    api_url = _env("MULTIAI_GITHUB_API_URL", _cfg("api_url", default="https://api.github.com"))
-    git_server = _env("MULTIAI_GITHUB_SERVER_URL", _cfg("git_server", default="https://github.com"))
-    http_timeout = _coerce_float(
-        _env("MULTIAI_GITHUB_HTTP_TIMEOUT", _cfg("http_timeout", default=DEFAULT_TIMEOUT)),
-        default=DEFAULT_TIMEOUT,
-    )
-    user_agent = _env("MULTIAI_GITHUB_USER_AGENT", _cfg("user_agent", default="multi-ai-orchestrator"))
-    dry_run = _coerce_bool(_env("MULTIAI_GITHUB_DRY_RUN", _cfg("dry_run", default=False)), default=False)
-
-    pr_title_template = _env("MULTIAI_GITHUB_PR_TITLE_TEMPLATE", _cfg("pr", "title_template"))
-    pr_body_template = _env("MULTIAI_GITHUB_PR_BODY_TEMPLATE", _cfg("pr", "body_template"))
-    pr_body_path = _env("MULTIAI_GITHUB_PR_BODY_PATH", _cfg("pr", "body_path"))
-    pr_body_literal = _env("MULTIAI_GITHUB_PR_BODY", _cfg("pr", "body"))
-
-    attestation_upload_url = _env("MULTIAI_ATTESTATION_UPLOAD_URL", _cfg("attestation_upload", "url"))
-    attestation_upload_method = (
-        _env("MULTIAI_ATTESTATION_UPLOAD_METHOD", _cfg("attestation_upload", "method", default=DEFAULT_PUSH_METHOD))
-        or DEFAULT_PUSH_METHOD
-    )
-    attestation_headers = _env("MULTIAI_ATTESTATION_UPLOAD_HEADERS", None)
+    attestation_headers = env.get("MULTIAI_ATTESTATION_UPLOAD_HEADERS")
     if attestation_headers is None:
-        headers_cfg = _cfg("attestation_upload", "headers")
+        headers_cfg = _walk(config_data, ("attestation_upload", "headers"))
     else:
         try:
             headers_cfg = json.loads(attestation_headers)
@@ -187,42 +206,15 @@ def _load_settings() -> ClientSettings:
     headers: Dict[str, str] = {}
     if isinstance(headers_cfg, Mapping):
         headers = {str(k): str(v) for k, v in headers_cfg.items()}
+    values["attestation_upload_headers"] = headers
 
-    attestation_upload_token = _env(
-        "MULTIAI_ATTESTATION_UPLOAD_TOKEN", _cfg("attestation_upload", "token")
+    private_key_value = env.get("MULTIAI_GITHUB_APP_PRIVATE_KEY", _walk(config_data, ("app", "private_key")))
+    private_key_path = env.get(
+        "MULTIAI_GITHUB_APP_PRIVATE_KEY_PATH", _walk(config_data, ("app", "private_key_path"))
     )
+    values["private_key"] = _load_private_key(private_key_value, private_key_path)
 
-    app_id = _env("MULTIAI_GITHUB_APP_ID", _cfg("app", "id"))
-    installation_id = _env("MULTIAI_GITHUB_INSTALLATION_ID", _cfg("app", "installation_id"))
-    private_key_value = _env("MULTIAI_GITHUB_APP_PRIVATE_KEY", _cfg("app", "private_key"))
-    private_key_path = _env("MULTIAI_GITHUB_APP_PRIVATE_KEY_PATH", _cfg("app", "private_key_path"))
-    private_key = _load_private_key(private_key_value, private_key_path)
-
-    return ClientSettings(
-        repository=repository,
-        base=base,
-        head_owner=head_owner,
-        push_url=push_url,
-        push_remote=push_remote,
-        force_push=force_push,
-        token=token,
-        app_id=app_id,
-        installation_id=installation_id,
-        private_key=private_key,
-        api_url=api_url,
-        git_server=git_server,
-        http_timeout=http_timeout,
-        user_agent=user_agent,
-        pr_title_template=pr_title_template,
-        pr_body_template=pr_body_template,
-        pr_body_path=pr_body_path,
-        pr_body_literal=pr_body_literal,
-        attestation_upload_url=attestation_upload_url,
-        attestation_upload_method=attestation_upload_method.upper(),
-        attestation_upload_headers=headers,
-        attestation_upload_token=attestation_upload_token,
-        dry_run=dry_run,
-    )
+    return ClientSettings(**values)
 
 
 def _obtain_access_token(settings: ClientSettings) -> AuthToken:
@@ -533,9 +525,11 @@ def _resolve_pr_body(settings: ClientSettings, description: Optional[str], conte
         path = Path(settings.pr_body_path)
         if not path.is_absolute():
             path = (REPO_ROOT / path).resolve()
-        if not path.exists():
-            raise GitHubAppError(f"PR body template file not found: {path}")
-        sections.append(path.read_text(encoding="utf-8").strip())
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise GitHubAppError(f"PR body template file not found: {path}") from None
+        sections.append(_read_template(str(path), mtime_ns))
 
     base_body = "\n\n".join(part for part in sections if part)
     if settings.pr_body_template:
@@ -545,6 +539,12 @@ def _resolve_pr_body(settings: ClientSettings, description: Optional[str], conte
     return base_body if base_body else None
 
 
+@functools.lru_cache(maxsize=32)
+def _read_template(path: str, mtime_ns: int) -> str:
+    # mtime_ns only participates in the cache key so edits to the file are picked up.
+    return Path(path).read_text(encoding="utf-8").strip()
+
+
 def _coerce_bool(value: Any, *, default: bool = False) -> bool:
     if value is None:
         return default
@@ -632,9 +632,15 @@ def _split_repository(repository: str) -> tuple[str, str]:
     return owner, repo
 
 
+@functools.lru_cache(maxsize=256)
 def _relative_to_repo(path: Optional[str]) -> str:
     if not path:
         return ""
+    if not os.path.isabs(path):
+        return path
+    normalized = os.path.normpath(path)
+    if normalized.startswith(_REPO_ROOT_PREFIX):
+        return normalized[len(_REPO_ROOT_PREFIX):]
     try:
         rel = Path(path).resolve().relative_to(REPO_ROOT)
         return str(rel)
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 import contextlib
+import functools
 import os
+import queue
+import random
 import sqlite3
 import threading
 import time
+import weakref
 from dataclasses import dataclass
-from typing import Dict, Iterator, List, Optional, Sequence
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 STATE_DIR = os.environ.get("MULTIAI_STATE_DIR") or "state"
 DEFAULT_DB_PATH = os.path.join(STATE_DIR, "locks.sqlite")
 DEFAULT_TTL_SECONDS = 15 * 60  # 15 minutes
 DEFAULT_HEARTBEAT_SECONDS = 60
 DEFAULT_ACQUIRE_TIMEOUT = 120  # seconds
-DEFAULT_RETRY_INTERVAL = 1.0
+DEFAULT_RETRY_INTERVAL = 1.0  # upper bound for the acquire backoff
+INITIAL_RETRY_DELAY = 0.005
+MAINTENANCE_INTERVAL = 64  # active() calls between WAL checkpoints
+MMAP_SIZE = 256 * 1024 * 1024
+READ_POOL_SIZE = 4
+# Columns the write paths read back; updated_at is always rewritten.
+_LOOKUP_COLUMNS = "shard, holder, ttl, heartbeat_interval, acquired_at, expires_at"
 
 
 class LeaseError(RuntimeError):
@@ -28,6 +39,31 @@ class LeaseNotHeld(LeaseError):
     """Raised when attempting to renew or release a lease that is not held."""
 
 
+@functools.lru_cache(maxsize=256)
+def _normalize_shard_tuple(shards: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(sorted({s.strip() for s in shards if s and s.strip()}))
+
+
+def _normalize_shards(shards: Sequence[str]) -> Tuple[str, ...]:
+    """Stripped, de-duplicated, sorted shard names.
+
+    Tuples are memoised, so heartbeat loops that pass the same shards back
+    (e.g. ``tuple(leases)`` from :meth:`LeaseManager.acquire`) skip the work.
+    """
+    if isinstance(shards, tuple):
+        return _normalize_shard_tuple(shards)
+    return tuple(sorted({s.strip() for s in shards if s and s.strip()}))
+
+
+def _close_connections(writer: sqlite3.Connection, readers: "queue.Queue[sqlite3.Connection]") -> None:
+    while True:
+        try:
+            readers.get_nowait().close()
+        except queue.Empty:
+            break
+    writer.close()
+
+
 @dataclass(frozen=True)
 class Lease:
     shard: str
@@ -56,28 +92,96 @@ class LeaseManager:
         self.acquire_timeout = float(acquire_timeout)
         self.retry_interval = float(max(retry_interval, 0.1))
         self._lock = threading.RLock()
+        self._wal_enabled = False
+        self._active_calls = 0
+        # Earliest expires_at this process knows of; purging is skipped before it.
+        self._next_expiry_hint = 0.0
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=READ_POOL_SIZE)
         self._ensure_parent()
+        # One long-lived writer per manager: pragmas and the WAL index are set
+        # up once and every write transaction reuses it under self._lock.
+        self._writer: Optional[sqlite3.Connection] = None
+        self._finalizer: Optional[weakref.finalize] = None
         self._initialise()
 
+    def close(self) -> None:
+        """Close the pooled connections; they are reopened lazily on next use."""
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+            self._writer = None
+            self._finalizer = None
+
     # -- private helpers -------------------------------------------------
 
     def _ensure_parent(self) -> None:
         parent = os.path.dirname(self.db_path) or "."
         os.makedirs(parent, exist_ok=True)
 
-    def _connect(self) -> sqlite3.Connection:
+    def _connect(self, *, read_only: bool = False) -> sqlite3.Connection:
+        target = self.db_path
+        if read_only:
+            target = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
         conn = sqlite3.connect(
-            self.db_path,
+            target,
             timeout=30,
             isolation_level=None,
             detect_types=sqlite3.PARSE_DECLTYPES,
             check_same_thread=False,
+            uri=read_only,
         )
         conn.row_factory = sqlite3.Row
+        self._configure(conn, read_only=read_only)
         return conn
 
+    def _configure(self, conn: sqlite3.Connection, *, read_only: bool = False) -> None:
+        # journal_mode=WAL is persistent in the database file, so it only needs
+        # to be set once; the remaining pragmas are per-connection.
+        if not read_only and not self._wal_enabled and self.db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+
+    def _maintain(self) -> None:
+        with self._lock:
+            conn = self._write_connection()
+            if self._wal_enabled:
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            conn.execute("PRAGMA optimize")
+
+    def _write_connection(self) -> sqlite3.Connection:
+        # Callers must hold self._lock; the writer is shared by every transaction.
+        if self._writer is None:
+            self._writer = self._connect()
+            # Closes the connections when the manager is collected or at exit,
+            # without the registry keeping the manager itself alive.
+            self._finalizer = weakref.finalize(self, _close_connections, self._writer, self._readers)
+        return self._writer
+
+    @contextlib.contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        if self.db_path == ":memory:":
+            # A private in-memory database is only visible to the writer connection.
+            with self._lock:
+                yield self._write_connection()
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only=True)
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
     def _initialise(self) -> None:
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS leases (
@@ -94,28 +198,35 @@ class LeaseManager:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_leases_holder ON leases(holder)"
             )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_leases_expires ON leases(expires_at)"
+            )
 
     @contextlib.contextmanager
     def _transaction(self) -> Iterator[sqlite3.Connection]:
         with self._lock:
-            conn = self._connect()
+            conn = self._write_connection()
+            conn.execute("BEGIN IMMEDIATE")
             try:
-                conn.execute("BEGIN IMMEDIATE")
                 yield conn
                 conn.commit()
-            except Exception:
+            except BaseException:
                 conn.rollback()
                 raise
-            finally:
-                conn.close()
 
     @staticmethod
     def _now() -> float:
         return time.time()
 
     def _purge_expired(self, conn: sqlite3.Connection, now: Optional[float] = None) -> None:
+        # Housekeeping only: lookups ignore expired rows, so skipping the DELETE
+        # (e.g. when another process wrote an earlier expiry) never changes results.
         ts = now if now is not None else self._now()
+        if ts < self._next_expiry_hint:
+            return
         conn.execute("DELETE FROM leases WHERE expires_at <= ?", (ts,))
+        earliest = conn.execute("SELECT MIN(expires_at) FROM leases").fetchone()[0]
+        self._next_expiry_hint = float("inf") if earliest is None else float(earliest)
 
     @staticmethod
     def _row_to_lease(row: sqlite3.Row) -> Lease:
@@ -129,38 +240,19 @@ class LeaseManager:
             expires_at=float(row["expires_at"]),
         )
 
-    def _try_acquire(
-        self,
-        conn: sqlite3.Connection,
-        shard: str,
-        holder: str,
-        ttl: Optional[float],
-        heartbeat: Optional[float],
-        now: float,
-    ) -> Optional[Lease]:
-        ttl_val = float(ttl if ttl is not None else self.default_ttl)
-        heartbeat_val = float(heartbeat if heartbeat is not None else self.default_heartbeat)
-        row = conn.execute("SELECT * FROM leases WHERE shard = ?", (shard,)).fetchone()
-        if row is not None and row["holder"] != holder and row["expires_at"] > now:
-            return None
-        acquired_at = row["acquired_at"] if row is not None and row["holder"] == holder else now
-        expires_at = now + ttl_val
-        conn.execute(
-            """
-            INSERT INTO leases(shard, holder, ttl, heartbeat_interval, acquired_at, updated_at, expires_at)
-            VALUES(?,?,?,?,?,?,?)
-            ON CONFLICT(shard) DO UPDATE SET
-                holder=excluded.holder,
-                ttl=excluded.ttl,
-                heartbeat_interval=excluded.heartbeat_interval,
-                acquired_at=excluded.acquired_at,
-                updated_at=excluded.updated_at,
-                expires_at=excluded.expires_at
-            """,
-            (shard, holder, ttl_val, heartbeat_val, acquired_at, now, expires_at),
+    @staticmethod
+    def _held_by_other(row: Optional[sqlite3.Row], holder: str, now: float) -> bool:
+        return row is not None and row["holder"] != holder and row["expires_at"] > now
+
+    @staticmethod
+    def _fetch_rows(conn: sqlite3.Connection, shards: Sequence[str], now: float) -> Dict[str, sqlite3.Row]:
+        """Unexpired lease rows for ``shards``, keyed by shard."""
+        placeholders = ",".join("?" * len(shards))
+        rows = conn.execute(
+            f"SELECT {_LOOKUP_COLUMNS} FROM leases WHERE shard IN ({placeholders}) AND expires_at > ?",
+            (*shards, now),
         )
-        updated = conn.execute("SELECT * FROM leases WHERE shard = ?", (shard,)).fetchone()
-        return self._row_to_lease(updated)
+        return {row["shard"]: row for row in rows}
 
     # -- public API ------------------------------------------------------
 
@@ -174,33 +266,68 @@ class LeaseManager:
         retry_interval: Optional[float] = None,
     ) -> Dict[str, Lease]:
         """Acquire leases for a collection of shards."""
-        unique_shards = sorted({s.strip() for s in shards if s and s.strip()})
+        unique_shards = _normalize_shards(shards)
         leases: Dict[str, Lease] = {}
         if not unique_shards:
             return leases
 
-        deadline = self._now() + (timeout if timeout is not None else self.acquire_timeout)
+        ttl_val = float(ttl if ttl is not None else self.default_ttl)
+        heartbeat_val = float(heartbeat if heartbeat is not None else self.default_heartbeat)
+        # Deadline math uses the monotonic clock; expires_at stays wall-clock so
+        # it remains comparable across processes.
+        deadline = time.monotonic() + (timeout if timeout is not None else self.acquire_timeout)
         retry = retry_interval if retry_interval is not None else self.retry_interval
+        delay = min(INITIAL_RETRY_DELAY, retry)
 
         last_error: Optional[str] = None
-        while self._now() <= deadline:
-            try:
-                with self._transaction() as conn:
-                    leases.clear()
-                    now = self._now()
-                    self._purge_expired(conn, now)
+        while time.monotonic() <= deadline:
+            with self._transaction() as conn:
+                now = self._now()
+                self._purge_expired(conn, now)
+                rows = self._fetch_rows(conn, unique_shards, now)
+                blocked = next(
+                    (shard for shard in unique_shards if self._held_by_other(rows.get(shard), holder, now)),
+                    None,
+                )
+                if blocked is None:
                     for shard in unique_shards:
-                        lease = self._try_acquire(conn, shard, holder, ttl, heartbeat, now)
-                        if lease is None:
-                            last_error = (
-                                f"shard '{shard}' currently held by another worker"
-                            )
-                            raise LeaseTimeout(last_error)
-                        leases[shard] = lease
-                return dict(leases)
-            except LeaseTimeout:
-                time.sleep(retry)
-                continue
+                        row = rows.get(shard)
+                        acquired_at = row["acquired_at"] if row is not None and row["holder"] == holder else now
+                        leases[shard] = Lease(
+                            shard=shard,
+                            holder=holder,
+                            ttl=ttl_val,
+                            heartbeat=heartbeat_val,
+                            acquired_at=float(acquired_at),
+                            updated_at=now,
+                            expires_at=now + ttl_val,
+                        )
+                    conn.executemany(
+                        """
+                        INSERT INTO leases(shard, holder, ttl, heartbeat_interval, acquired_at, updated_at, expires_at)
+                        VALUES(?,?,?,?,?,?,?)
+                        ON CONFLICT(shard) DO UPDATE SET
+                            holder=excluded.holder,
+                            ttl=excluded.ttl,
+                            heartbeat_interval=excluded.heartbeat_interval,
+                            acquired_at=excluded.acquired_at,
+                            updated_at=excluded.updated_at,
+                            expires_at=excluded.expires_at
+                        """,
+                        [
+                            (l.shard, l.holder, l.ttl, l.heartbeat, l.acquired_at, l.updated_at, l.expires_at)
+                            for l in leases.values()
+                        ],
+                    )
+                    self._next_expiry_hint = min(self._next_expiry_hint, now + ttl_val)
+                    return leases
+            last_error = f"shard '{blocked}' currently held by another worker"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Exponential backoff with jitter so contending workers spread out.
+            time.sleep(min(delay + random.uniform(0, delay * 0.25), remaining))
+            delay = min(delay * 2, retry)
         raise LeaseTimeout(last_error or "timed out acquiring shard leases")
 
     def renew(
@@ -210,7 +337,7 @@ class LeaseManager:
         ttl: Optional[float] = None,
         heartbeat: Optional[float] = None,
     ) -> Dict[str, Lease]:
-        unique_shards = sorted({s.strip() for s in shards if s and s.strip()})
+        unique_shards = _normalize_shards(shards)
         renewed: Dict[str, Lease] = {}
         if not unique_shards:
             return renewed
@@ -218,43 +345,64 @@ class LeaseManager:
         with self._transaction() as conn:
             now = self._now()
             self._purge_expired(conn, now)
+            rows = self._fetch_rows(conn, unique_shards, now)
             for shard in unique_shards:
-                row = conn.execute("SELECT * FROM leases WHERE shard = ?", (shard,)).fetchone()
+                row = rows.get(shard)
                 if row is None or row["holder"] != holder:
                     raise LeaseNotHeld(f"lease for shard '{shard}' not held by {holder}")
                 ttl_val = float(ttl if ttl is not None else row["ttl"])
                 heartbeat_val = float(heartbeat if heartbeat is not None else row["heartbeat_interval"])
-                expires_at = now + ttl_val
-                conn.execute(
-                    "UPDATE leases SET ttl = ?, heartbeat_interval = ?, updated_at = ?, expires_at = ? WHERE shard = ?",
-                    (ttl_val, heartbeat_val, now, expires_at, shard),
+                renewed[shard] = Lease(
+                    shard=shard,
+                    holder=holder,
+                    ttl=ttl_val,
+                    heartbeat=heartbeat_val,
+                    acquired_at=float(row["acquired_at"]),
+                    updated_at=now,
+                    expires_at=now + ttl_val,
                 )
-                refreshed = conn.execute("SELECT * FROM leases WHERE shard = ?", (shard,)).fetchone()
-                renewed[shard] = self._row_to_lease(refreshed)
+            conn.executemany(
+                "UPDATE leases SET ttl = ?, heartbeat_interval = ?, updated_at = ?, expires_at = ? "
+                "WHERE shard = ? AND holder = ?",
+                [(l.ttl, l.heartbeat, l.updated_at, l.expires_at, l.shard, holder) for l in renewed.values()],
+            )
+            self._next_expiry_hint = min(
+                self._next_expiry_hint, min(l.expires_at for l in renewed.values())
+            )
         return renewed
 
     def release(self, shards: Sequence[str], holder: str) -> None:
-        unique_shards = sorted({s.strip() for s in shards if s and s.strip()})
+        unique_shards = _normalize_shards(shards)
         if not unique_shards:
             return
+        placeholders = ",".join("?" * len(unique_shards))
         with self._transaction() as conn:
             now = self._now()
             self._purge_expired(conn, now)
-            for shard in unique_shards:
-                row = conn.execute("SELECT * FROM leases WHERE shard = ?", (shard,)).fetchone()
-                if row is None:
-                    continue
-                if row["holder"] != holder:
+            deleted = conn.execute(
+                f"DELETE FROM leases WHERE shard IN ({placeholders}) AND holder = ?",
+                (*unique_shards, holder),
+            ).rowcount
+            if deleted < len(unique_shards):
+                # Some shards were not ours: fine if free, an error if held by
+                # someone else (raising rolls the DELETE back).
+                other = conn.execute(
+                    f"SELECT shard FROM leases WHERE shard IN ({placeholders}) AND expires_at > ? ORDER BY shard LIMIT 1",
+                    (*unique_shards, now),
+                ).fetchone()
+                if other is not None:
                     raise LeaseNotHeld(
-                        f"cannot release shard '{shard}' not held by {holder}"
+                        f"cannot release shard '{other['shard']}' not held by {holder}"
                     )
-                conn.execute("DELETE FROM leases WHERE shard = ?", (shard,))
 
     def active(self) -> List[Lease]:
-        with self._transaction() as conn:
-            now = self._now()
-            self._purge_expired(conn, now)
-            rows = conn.execute("SELECT * FROM leases").fetchall()
+        # Read-only: expired rows are filtered here and purged by the next write.
+        now = self._now()
+        with self._read_connection() as conn:
+            rows = conn.execute("SELECT * FROM leases WHERE expires_at > ?", (now,)).fetchall()
+        self._active_calls += 1
+        if self._active_calls % MAINTENANCE_INTERVAL == 0:
+            self._maintain()
         return [self._row_to_lease(r) for r in rows]
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import re
 from typing import Iterable
 
@@ -16,8 +17,33 @@ _BLOCKED_PATTERNS: tuple[str, ...] = (
 )
 
 
+# Maps \x00-\x08, \x0b, \x0c, \x0e-\x1f and \x7f to a space; tab, LF and CR are kept.
+_CONTROL_TABLE = {c: 0x20 for c in (*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F)}
+
+
+_NO_INLINE_FLAGS = re.compile("").flags
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_blocked(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Join *patterns* into one alternation, or return None when that is unsafe.
+
+    Capture groups would be renumbered (breaking backreferences and repeated
+    named groups) and inline global flags are only legal at the start of a
+    pattern, so such sets are matched one pattern at a time instead.
+    """
+    for pattern in patterns:
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            return None
+        if compiled.groups or compiled.flags != _NO_INLINE_FLAGS:
+            return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
 def _strip_control(text: str) -> str:
-    return re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", " ", text)
+    return text.translate(_CONTROL_TABLE)
 
 
 def sanitize(text: str, *, max_length: int = _DEFAULT_MAX_LENGTH, blocked_patterns: Iterable[str] | None = None) -> str:
@@ -33,10 +59,16 @@ def sanitize(text: str, *, max_length: int = _DEFAULT_MAX_LENGTH, blocked_patter
         cleaned = cleaned[:max_length].rstrip()
 
     patterns = tuple(blocked_patterns) if blocked_patterns else _BLOCKED_PATTERNS
-    lowered = cleaned.lower()
-    for pattern in patterns:
-        if re.search(pattern, lowered, flags=re.IGNORECASE):
-            raise PromptRejected(f"prompt rejected by guard pattern: {pattern}")
+    combined = _compile_blocked(patterns)
+    if combined is None:
+        lowered = cleaned.lower()
+        for pattern in patterns:
+            if re.search(pattern, lowered, flags=re.IGNORECASE):
+                raise PromptRejected(f"prompt rejected by guard pattern: {pattern}")
+    elif combined.search(cleaned):
+        # Only the rejection path needs to know which pattern fired.
+        pattern = next(p for p in patterns if re.search(p, cleaned, flags=re.IGNORECASE))
+        raise PromptRejected(f"prompt rejected by guard pattern: {pattern}")
 
     return cleaned
 
@@ -3,10 +3,16 @@ import os
 import json
 import time
 import tempfile
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 # Queue file lives under ./logs by default; override with env if needed.
 DEFAULT_QUEUE_PATH = os.environ.get("MULTIAI_QUEUE_PATH", os.path.join("logs", "task_queue.jsonl"))
+# Consumed records are dropped from the file once they exceed this size and
+# make up more than half of it.
+COMPACT_MIN_BYTES = 64 * 1024
+# Serializes appends, pops and compaction within a process.
+_LOCK = threading.Lock()
 
 def _ensure_parent(path: str) -> None:
     parent = os.path.dirname(path) or "."
@@ -27,48 +33,171 @@ def _atomic_write(path: str, data: str) -> None:
         except Exception:
             pass
 
-def _read_lines(path: str) -> list:
-    if not os.path.exists(path):
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        return [ln for ln in (l.strip() for l in f.readlines()) if ln]
+def _offset_path(path: str) -> str:
+    return path + ".offset"
+
+def _read_offset(path: str, st: os.stat_result) -> int:
+    """Byte offset of the next unread record.
+
+    The sidecar stores ``"<offset> <st_ino> <st_dev>"``; the offset resets to 0
+    when the queue file was replaced by a different one or shrank.
+    """
+    try:
+        with open(_offset_path(path), "r", encoding="utf-8") as f:
+            fields = f.read().split()
+        offset = int(fields[0]) if fields else 0
+        identity = tuple(int(x) for x in fields[1:3])
+    except (OSError, ValueError):
+        return 0
+    # A bare offset predates the identity fields; trust it like before.
+    if identity and identity != (st.st_ino, st.st_dev):
+        return 0
+    return offset if 0 <= offset <= st.st_size else 0
+
+def _write_offset(path: str, offset: int, st: os.stat_result) -> None:
+    _atomic_write(_offset_path(path), f"{offset} {st.st_ino} {st.st_dev}")
+
+def _maybe_compact(path: str, offset: int, size: int) -> None:
+    if offset < COMPACT_MIN_BYTES or offset * 2 < size:
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        tail = f.read()
+    _atomic_write(path, tail.decode("utf-8"))
+    _write_offset(path, 0, os.stat(path))
+
+def _parse_tail(raw: bytes) -> Optional[Any]:
+    """Parse a final line that has no newline yet.
+
+    A tail that is complete JSON is a record whose writer did not end it with
+    a newline; anything else is taken to be still being appended.
+    """
+    line = raw.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+def _record(task_type: str, payload: Dict[str, Any], now: int) -> Dict[str, Any]:
+    return {
+        "time": now,
+        "type": str(task_type),
+        "payload": payload or {},
+    }
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
 
 def enqueue(task_type: str, payload: Dict[str, Any], queue_path: Optional[str] = None) -> Dict[str, Any]:
     """Append a task (JSONL). Returns the enqueued record."""
+    return enqueue_many([(task_type, payload)], queue_path=queue_path)[0]
+
+def enqueue_many(
+    items: Iterable[Tuple[str, Dict[str, Any]]], queue_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Append several ``(task_type, payload)`` tasks with one open and one write.
+
+    Returns the enqueued records in order.
+    """
     qp = queue_path or DEFAULT_QUEUE_PATH
+    now = int(time.time())
+    records = [_record(task_type, payload, now) for task_type, payload in items]
+    if not records:
+        return records
     _ensure_parent(qp)
-    record = {
-        "time": int(time.time()),
-        "type": str(task_type),
-        "payload": payload or {},
-    }
-    line = json.dumps(record, ensure_ascii=False)
-    with open(qp, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
-    return record
+    data = "".join(_dumps(record) + "\n" for record in records)
+    with _LOCK, open(qp, "a", encoding="utf-8") as f:
+        f.write(data)
+    return records
 
 def length(queue_path: Optional[str] = None) -> int:
     qp = queue_path or DEFAULT_QUEUE_PATH
-    return len(_read_lines(qp))
+    if not os.path.exists(qp):
+        return 0
+    with open(qp, "rb") as f:
+        f.seek(_read_offset(qp, os.fstat(f.fileno())))
+        n = 0
+        for ln in f:
+            if ln.endswith(b"\n"):
+                n += bool(ln.strip())
+            else:
+                n += _parse_tail(ln) is not None
+        return n
 
 def dequeue(queue_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
-    """Pop the oldest task. Returns None if empty. Uses an atomic rewrite to avoid partial writes."""
+    """Pop the oldest task. Returns None if empty.
+
+    Reads from the offset recorded in ``<queue>.offset`` instead of rewriting the
+    whole file; malformed lines are skipped (best-effort).
+    """
     qp = queue_path or DEFAULT_QUEUE_PATH
-    lines = _read_lines(qp)
-    if not lines:
-        return None
-    head = lines[0]
-    rest = lines[1:]
-    # Atomic rewrite
-    _atomic_write(qp, "".join(l + "\n" for l in rest))
-    try:
-        return json.loads(head)
-    except json.JSONDecodeError:
-        # Skip malformed head and continue (best-effort)
-        if rest:
-            _atomic_write(qp, "".join(l + "\n" for l in rest[1:]))
+    with _LOCK:
+        if not os.path.exists(qp):
+            return None
+        with open(qp, "rb") as f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            offset = _read_offset(qp, st)
+            f.seek(offset)
+            record = None
+            while record is None:
+                raw = f.readline()
+                if not raw.endswith(b"\n"):
+                    # EOF, or a record still being appended unless it parses
+                    record = _parse_tail(raw)
+                    if record is not None:
+                        offset += len(raw)
+                    break
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        _write_offset(qp, offset, st)
+        _maybe_compact(qp, offset, size)
+    return record
+
+def drain(queue_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pop every complete pending task in one read, oldest first.
+
+    The file is truncated when everything in it was consumed; a trailing
+    record still being appended is left in place for the next call.
+    Malformed lines are skipped and an unterminated tail is handled as in
+    :func:`dequeue`.
+    """
+    qp = queue_path or DEFAULT_QUEUE_PATH
+    with _LOCK:
+        if not os.path.exists(qp):
+            return []
+        with open(qp, "r+b") as f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            offset = _read_offset(qp, st)
+            f.seek(offset)
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            tail = _parse_tail(data[end:])
+            if tail is not None:
+                end = len(data)
+            if end == len(data):
+                f.truncate(0)
+        records = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
             try:
-                return json.loads(rest[0])
-            except Exception:
-                return None
-        return None
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        if end == len(data):
+            _write_offset(qp, 0, st)
+        else:
+            _write_offset(qp, offset + end, st)
+            _maybe_compact(qp, offset + end, size)
+    return records
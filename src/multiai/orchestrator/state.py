@@ -1,29 +1,56 @@
-
-import os, json
+import os, json, tempfile
 
 STATE_DIR = os.environ.get("MULTIAI_STATE_DIR") or "state"
 STATE_PATH = os.path.join(STATE_DIR, "pipeline.json")
 
+# Parsed state keyed by the file's (device, inode, mtime_ns, size) so repeated
+# loads skip JSON parsing; save() always replaces the file, so every write gets
+# a new inode.
+_CACHE = None
+_CACHE_KEY = None
+
 def _ensure_dir(p):
     d = os.path.dirname(p) or "."
     os.makedirs(d, exist_ok=True)
 
+def _stat_key(p):
+    st = os.stat(p)
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
 def load():
-    if not os.path.exists(STATE_PATH):
+    global _CACHE, _CACHE_KEY
+    try:
+        key = _stat_key(STATE_PATH)
+    except FileNotFoundError:
         return {}
-    with open(STATE_PATH, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {}
+    if _CACHE is None or key != _CACHE_KEY:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except Exception:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        _CACHE, _CACHE_KEY = data, key
+    return dict(_CACHE)
 
 def save(d):
+    global _CACHE, _CACHE_KEY
     _ensure_dir(STATE_PATH)
-    with open(STATE_PATH, "w", encoding="utf-8") as f:
-        json.dump(d, f, ensure_ascii=False, indent=2)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_state_", dir=os.path.dirname(STATE_PATH) or ".", text=True)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(d, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, STATE_PATH)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _CACHE, _CACHE_KEY = dict(d), _stat_key(STATE_PATH)
 
 def set_artifact(key, path):
     s = load()
+    if s.get(key) == path:
+        return
     s[key] = path
     save(s)
 
@@ -8,16 +8,43 @@ from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from multiai.tools.kelly import kelly_optimal_fraction_gaussian
-from multiai.tools.combiner import combine_allocations
+from multiai.dataops.parquet_io import read_columns
+from multiai.tools.kelly import gaussian_sign_probabilities, kelly_optimal_fraction_gaussian_batch
+from multiai.tools.combiner import combine_allocations_batch
+from multiai.tools.jit import njit
 
 
 def _ensure_datetime(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.DatetimeTZDtype) and str(series.dtype.tz) == "UTC":
+        return series
     ts = pd.to_datetime(series, utc=True)
     return ts.dt.tz_convert("UTC") if getattr(ts.dtype, "tz", None) else ts.dt.tz_localize("UTC")
 
 
+PARQUET_CHUNK_ROWS = 10_000
+EQUITY_COLUMNS = ["timestamp", "equity"]
+
+
+def _write_log_parquet(logs_df: pd.DataFrame, log_path: str, equity_path: str,
+                       chunk_rows: int = PARQUET_CHUNK_ROWS) -> None:
+    """Write the session log and its equity curve in ``chunk_rows`` slices.
+
+    Each slice is converted to Arrow once and feeds both writers; the equity
+    file takes a zero-copy column selection of the same table.
+    """
+    schema = pa.Schema.from_pandas(logs_df, preserve_index=False)
+    equity_schema = pa.schema([schema.field(name) for name in EQUITY_COLUMNS])
+    with pq.ParquetWriter(log_path, schema) as log_writer, \
+            pq.ParquetWriter(equity_path, equity_schema) as equity_writer:
+        for start in range(0, len(logs_df), chunk_rows):
+            table = pa.Table.from_pandas(logs_df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False)
+            log_writer.write_table(table)
+            equity_writer.write_table(table.select(EQUITY_COLUMNS))
+
+
 def _detect_horizons(columns: Iterable[str]) -> List[int]:
     horizons: List[int] = []
     for col in columns:
@@ -30,14 +57,84 @@ def _detect_horizons(columns: Iterable[str]) -> List[int]:
     return horizons
 
 
-def _norm_probabilities(mu: float, sigma: float) -> Tuple[float, float]:
-    if not math.isfinite(mu) or not math.isfinite(sigma) or sigma <= 1e-12:
-        return 0.5, 0.5
-    z = (0.0 - mu) / (sigma * math.sqrt(2.0))
-    prob_down = 0.5 * (1.0 + math.erf(z))
-    prob_down = min(max(prob_down, 0.0), 1.0)
-    prob_up = 1.0 - prob_down
-    return prob_up, prob_down
+ALERT_NONE, ALERT_STOP_LOSS, ALERT_TAKE_PROFIT = 0, 1, 2
+_ALERT_TYPES = {ALERT_STOP_LOSS: "stop_loss", ALERT_TAKE_PROFIT: "take_profit"}
+
+
+@njit(cache=True)
+def _run_positions(prices, weighted, cap, hysteresis, stop_loss, take_profit,
+                   cash, units, entry_price, position_fraction):
+    """Sequential cash/position update over precomputed target allocations.
+
+    ``entry_price`` is NaN when flat. Returns the per-row outputs followed by
+    the final (cash, units, entry_price, position_fraction) state.
+    """
+    n = prices.shape[0]
+    allocation = np.empty(n)
+    pos_fraction = np.empty(n)
+    cash_out = np.empty(n)
+    equity_out = np.empty(n)
+    notional_out = np.empty(n)
+    alert_kind = np.zeros(n, dtype=np.int8)
+    alert_return = np.zeros(n)
+    for i in range(n):
+        price = prices[i]
+        target = weighted[i]
+        if target < -cap:
+            target = -cap
+        elif target > cap:
+            target = cap
+
+        if abs(target - position_fraction) < hysteresis:
+            target = position_fraction
+
+        if units != 0.0 and entry_price == entry_price and entry_price != 0.0:
+            direction = 1.0 if units > 0.0 else -1.0
+            entry = max(entry_price, 1e-12)
+            pnl = direction * ((price - entry) / entry)
+            if pnl <= -stop_loss:
+                target = 0.0
+                alert_kind[i] = ALERT_STOP_LOSS
+                alert_return[i] = pnl
+            elif pnl >= take_profit:
+                target = 0.0
+                alert_kind[i] = ALERT_TAKE_PROFIT
+                alert_return[i] = pnl
+
+        if target < -cap:
+            target = -cap
+        elif target > cap:
+            target = cap
+
+        equity = cash + units * price
+        desired_units = 0.0
+        if price > 0.0 and equity > 0.0:
+            desired_units = target * equity / price
+        else:
+            target = 0.0
+
+        trade_units = desired_units - units
+        if abs(trade_units) > 1e-9:
+            cash -= trade_units * price
+            units = desired_units
+            if abs(units) < 1e-9:
+                entry_price = np.nan
+            else:
+                entry_price = price
+
+        equity = cash + units * price
+        notional = units * price
+        position_fraction = 0.0
+        if equity > 1e-9:
+            position_fraction = notional / equity
+
+        allocation[i] = target
+        pos_fraction[i] = position_fraction
+        cash_out[i] = cash
+        equity_out[i] = equity
+        notional_out[i] = notional
+    return (allocation, pos_fraction, cash_out, equity_out, notional_out, alert_kind, alert_return,
+            cash, units, entry_price, position_fraction)
 
 
 @dataclass
@@ -85,30 +182,22 @@ class PaperTradingSession:
         self.session_end: Optional[pd.Timestamp] = None
         self._alerts: List[Dict[str, object]] = []
 
-    def _kelly_metrics(self, mu: float, sigma: float) -> Dict[str, float]:
-        if not math.isfinite(mu) or not math.isfinite(sigma) or sigma <= 0.0:
-            prob_up, prob_down = 0.5, 0.5
-            return {
-                "fraction": 0.0,
-                "integral": 0.0,
-                "gaussian_fraction": 0.0,
-                "prob_up": prob_up,
-                "prob_down": prob_down,
-            }
-        f_star, g_star, f_gauss = kelly_optimal_fraction_gaussian(
-            mu,
-            sigma,
+    def _kelly_metrics(self, mu: np.ndarray, sigma: np.ndarray) -> Dict[str, np.ndarray]:
+        valid = np.isfinite(mu) & np.isfinite(sigma) & (sigma > 0.0)
+        cap = abs(self.config.exposure_cap)
+        f_star, g_star, f_gauss = kelly_optimal_fraction_gaussian_batch(
+            np.where(valid, mu, 0.0),
+            np.where(valid, sigma, 0.0),
             cost_bps_per_leg=float(self.config.cost_bps_per_leg),
             sl=float(self.config.stop_loss),
             tp=float(self.config.take_profit),
             f_cap=float(self.config.exposure_cap),
         )
-        f_star = float(np.clip(f_star, -abs(self.config.exposure_cap), abs(self.config.exposure_cap)))
-        prob_up, prob_down = _norm_probabilities(mu, sigma)
+        prob_up, prob_down = gaussian_sign_probabilities(mu, sigma)
         return {
-            "fraction": f_star,
-            "integral": float(g_star),
-            "gaussian_fraction": float(f_gauss),
+            "fraction": np.where(valid, np.clip(f_star, -cap, cap), 0.0),
+            "integral": np.where(valid, g_star, 0.0),
+            "gaussian_fraction": np.where(valid, f_gauss, 0.0),
             "prob_up": prob_up,
             "prob_down": prob_down,
         }
@@ -121,9 +210,14 @@ class PaperTradingSession:
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         if "timestamp" not in predictions.columns:
             raise ValueError("predictions frame requires 'timestamp'")
-        preds = predictions.copy()
+        # Only the columns the session reads are carried forward, so the
+        # caller's frame is never copied wholesale.
+        keep = ["timestamp"] + [c for c in predictions.columns if c.startswith(("pred_mu_h", "pred_sigma_h"))]
+        if market is None and price_col in predictions.columns:
+            keep.append(price_col)
+        preds = predictions.loc[:, keep]
         preds["timestamp"] = _ensure_datetime(preds["timestamp"])
-        preds = preds.sort_values("timestamp").reset_index(drop=True)
+        preds = preds.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
         horizons = _detect_horizons(preds.columns)
         if not horizons:
             raise ValueError("predictions frame missing pred_mu_h* columns")
@@ -131,14 +225,14 @@ class PaperTradingSession:
         if market is not None:
             if "timestamp" not in market.columns:
                 raise ValueError("market frame requires 'timestamp'")
-            market_df = market.copy()
-            market_df["timestamp"] = _ensure_datetime(market_df["timestamp"])
-            if price_col not in market_df.columns:
+            if price_col not in market.columns:
                 raise ValueError(f"market frame missing price column '{price_col}'")
-            market_df = market_df.sort_values("timestamp")
+            market_df = market.loc[:, ["timestamp", price_col]]
+            market_df["timestamp"] = _ensure_datetime(market_df["timestamp"])
+            market_df = market_df.sort_values("timestamp", kind="mergesort")
             merged = pd.merge_asof(
                 preds,
-                market_df[["timestamp", price_col]],
+                market_df,
                 on="timestamp",
                 direction="nearest",
             )
@@ -154,106 +248,73 @@ class PaperTradingSession:
         if limit <= 0:
             return pd.DataFrame(), pd.DataFrame(columns=["timestamp", "type", "return"])
 
-        logs: List[Dict[str, object]] = []
+        rows = merged.iloc[:limit]
+        timestamps = rows["timestamp"].reset_index(drop=True)
+        prices = rows["price"].to_numpy(dtype=float)
+        prices = np.where(np.isfinite(prices) & (prices > 0.0), prices, 0.0)
+        mu_cols = [f"pred_mu_h{h}" for h in horizons]
+        sigma_cols = [f"pred_sigma_h{h}" for h in horizons]
+        mu = rows[mu_cols].to_numpy(dtype=float)
+        # A horizon without a sigma column contributes zeros (treated as invalid).
+        sigma = rows.reindex(columns=sigma_cols, fill_value=0.0).to_numpy(dtype=float)
+        metrics = self._kelly_metrics(mu, sigma)
         cap = float(abs(self.config.exposure_cap))
-        for idx in range(limit):
-            row = merged.iloc[idx]
-            ts = row["timestamp"]
-            if not isinstance(ts, pd.Timestamp):
-                ts = pd.Timestamp(ts, tz="UTC")
-            price = float(row.get("price", np.nan))
-            if not math.isfinite(price) or price <= 0.0:
-                price = 0.0
-
-            metrics_by_h: Dict[int, Dict[str, float]] = {}
-            fractions: List[float] = []
-            sigmas: List[float] = []
-            for h in horizons:
-                mu = float(row.get(f"pred_mu_h{h}", 0.0))
-                sigma = float(row.get(f"pred_sigma_h{h}", 0.0))
-                metrics = self._kelly_metrics(mu, sigma)
-                metrics_by_h[h] = metrics
-                fractions.append(metrics["fraction"])
-                sigmas.append(max(abs(sigma), 1e-12))
-
-            weighted = 0.0
-            if fractions:
-                weighted = combine_allocations(
-                    np.array(fractions, dtype=float),
-                    np.array(sigmas, dtype=float),
-                    cap=cap,
-                )
-
-            target_fraction = float(weighted)
-            raw_fraction = target_fraction
-            target_fraction = float(np.clip(target_fraction, -cap, cap))
-
-            if abs(target_fraction - self.position_fraction) < float(self.config.hysteresis):
-                target_fraction = self.position_fraction
-
-            if self.position_units != 0.0 and self.entry_price:
-                direction = math.copysign(1.0, self.position_units)
-                entry_price = max(self.entry_price, 1e-12)
-                pnl = direction * ((price - entry_price) / entry_price)
-                if pnl <= -float(self.config.stop_loss):
-                    target_fraction = 0.0
-                    self._alerts.append({"timestamp": ts, "type": "stop_loss", "return": pnl})
-                elif pnl >= float(self.config.take_profit):
-                    target_fraction = 0.0
-                    self._alerts.append({"timestamp": ts, "type": "take_profit", "return": pnl})
-
-            target_fraction = float(np.clip(target_fraction, -cap, cap))
-
-            equity = self.cash + self.position_units * price
-            desired_units = 0.0
-            if price > 0.0 and equity > 0.0:
-                desired_units = target_fraction * equity / price
-            else:
-                target_fraction = 0.0
-
-            trade_units = desired_units - self.position_units
-            if abs(trade_units) > 1e-9:
-                self.cash -= trade_units * price
-                self.position_units = desired_units
-                if abs(self.position_units) < 1e-9:
-                    self.entry_price = None
-                else:
-                    self.entry_price = price
-
-            equity = self.cash + self.position_units * price
-            position_notional = self.position_units * price
-            actual_fraction = 0.0
-            if equity > 1e-9:
-                actual_fraction = position_notional / equity
-            self.position_fraction = float(actual_fraction)
-
-            log_row: Dict[str, object] = {
-                "timestamp": ts,
-                "price": price,
-                "kelly_weighted": float(weighted),
-                "allocation_fraction": target_fraction,
-                "position_fraction": float(self.position_fraction),
-                "cash": float(self.cash),
-                "equity": float(equity),
-                "position_notional": float(position_notional),
-                "raw_fraction": float(raw_fraction),
-            }
-
-            for h in horizons:
-                metrics = metrics_by_h[h]
-                log_row[f"kelly_weight_h{h}"] = metrics["fraction"]
-                log_row[f"kelly_integral_h{h}"] = metrics["integral"]
-                log_row[f"kelly_gaussian_h{h}"] = metrics["gaussian_fraction"]
-                log_row[f"prob_up_h{h}"] = metrics["prob_up"]
-                log_row[f"prob_down_h{h}"] = metrics["prob_down"]
-
-            logs.append(log_row)
-
-            if self.session_start is None:
-                self.session_start = ts
-            self.session_end = ts
-
-        log_df = pd.DataFrame(logs)
+        weighted_all = combine_allocations_batch(metrics["fraction"], np.maximum(np.abs(sigma), 1e-12), cap=cap)
+
+        (allocation, pos_fraction, cash_out, equity_out, notional_out, alert_kind, alert_return,
+         cash, units, entry_price, position_fraction) = _run_positions(
+            prices,
+            weighted_all,
+            cap,
+            float(self.config.hysteresis),
+            float(self.config.stop_loss),
+            float(self.config.take_profit),
+            float(self.cash),
+            float(self.position_units),
+            np.nan if self.entry_price is None else float(self.entry_price),
+            float(self.position_fraction),
+        )
+        self.cash = float(cash)
+        self.position_units = float(units)
+        self.entry_price = None if math.isnan(entry_price) else float(entry_price)
+        self.position_fraction = float(position_fraction)
+
+        for idx in np.flatnonzero(alert_kind):
+            self._alerts.append(
+                {
+                    "timestamp": timestamps.iloc[idx],
+                    "type": _ALERT_TYPES[int(alert_kind[idx])],
+                    "return": float(alert_return[idx]),
+                }
+            )
+
+        if self.session_start is None:
+            self.session_start = timestamps.iloc[0]
+        self.session_end = timestamps.iloc[-1]
+
+        columns: Dict[str, object] = {
+            "timestamp": timestamps,
+            "price": prices,
+            "kelly_weighted": weighted_all,
+            "allocation_fraction": allocation,
+            "position_fraction": pos_fraction,
+            "cash": cash_out,
+            "equity": equity_out,
+            "position_notional": notional_out,
+            "raw_fraction": weighted_all,
+        }
+        per_horizon = (
+            ("kelly_weight_h", metrics["fraction"]),
+            ("kelly_integral_h", metrics["integral"]),
+            ("kelly_gaussian_h", metrics["gaussian_fraction"]),
+            ("prob_up_h", metrics["prob_up"]),
+            ("prob_down_h", metrics["prob_down"]),
+        )
+        columns.update(
+            {f"{prefix}{h}": values[:, j] for j, h in enumerate(horizons) for prefix, values in per_horizon}
+        )
+        log_df = pd.DataFrame(columns)
+
         alerts_df = pd.DataFrame(self._alerts)
         if alerts_df.empty:
             alerts_df = pd.DataFrame(
@@ -278,8 +339,11 @@ def run(
     config: Optional[SessionConfig] = None,
 ) -> SessionResult:
     cfg = config or SessionConfig()
-    preds = pd.read_parquet(predictions_path)
-    market_df = pd.read_parquet(market_path) if market_path else None
+    preds = read_columns(
+        predictions_path,
+        lambda c: c in ("timestamp", price_col) or c.startswith(("pred_mu_h", "pred_sigma_h")),
+    )
+    market_df = read_columns(market_path, lambda c: c in ("timestamp", price_col)) if market_path else None
     session = PaperTradingSession(cfg)
     logs_df, alerts_df = session.run(preds, market_df, price_col=price_col)
 
@@ -297,9 +361,11 @@ def run(
     equity_path = os.path.join(out_dir, f"equity_curve_{tag}.parquet")
     alerts_path = os.path.join(out_dir, f"alerts_{tag}.parquet")
 
-    logs_df.to_parquet(log_path, index=False)
-    equity_df = logs_df[["timestamp", "equity"]].copy()
-    equity_df.to_parquet(equity_path, index=False)
+    if logs_df.empty:
+        logs_df.to_parquet(log_path, index=False)
+        logs_df.reindex(columns=EQUITY_COLUMNS).to_parquet(equity_path, index=False)
+    else:
+        _write_log_parquet(logs_df, log_path, equity_path)
     alerts_df.to_parquet(alerts_path, index=False)
 
     return SessionResult(
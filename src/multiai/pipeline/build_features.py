@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from multiai.dataops.parquet_io import write_parquet
+
 def run_build_features(merged_path: str, out_path: str, price_col: str = "trade_price", verbose: bool=False):
     """
     Build model-ready features from the merged on/off-chain Parquet.
@@ -12,7 +14,8 @@ def run_build_features(merged_path: str, out_path: str, price_col: str = "trade_
     df = pd.read_parquet(merged_path)
     if "timestamp" not in df.columns:
         raise ValueError("timestamp column missing in merged file")
-    df = df.sort_values("timestamp").reset_index(drop=True)
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp").reset_index(drop=True)
 
     # Ensure primary price column per Project Plan: prefer 'trade_price', fallback to mid_price, else synthesize from best bid/ask.
     if price_col not in df.columns:
@@ -25,12 +28,19 @@ def run_build_features(merged_path: str, out_path: str, price_col: str = "trade_
         else:
             raise ValueError(f"Price column '{price_col}' not found and cannot be synthesized from best_bid/best_ask.")
 
-    # 1-second return used by backtest gate
-    df["ret_1s"] = df[price_col].pct_change().fillna(0.0)
+    # 1-second return used by backtest gate; computed in float32 to halve the
+    # bytes moved (gaps are padded as pct_change does, leading gaps are 0)
+    p = df[price_col].ffill().to_numpy(dtype=np.float32)
+    ret = np.zeros_like(p)
+    if len(p) > 1:
+        np.divide(p[1:], p[:-1], out=ret[1:])
+        ret[1:] -= 1.0
+        np.copyto(ret, 0.0, where=np.isnan(ret))
+    df["ret_1s"] = ret
 
     # Convenience: L1 spread if available
     if "best_ask" in df.columns and "best_bid" in df.columns:
-        df["spread_l1"] = df["best_ask"] - df["best_bid"]
+        df["spread_l1"] = df["best_ask"].to_numpy(dtype=np.float32) - df["best_bid"].to_numpy(dtype=np.float32)
 
     # Enforce: no object dtypes for model input
     obj_cols = [c for c in df.columns if df[c].dtype == 'object']
@@ -38,6 +48,6 @@ def run_build_features(merged_path: str, out_path: str, price_col: str = "trade_
         if verbose: print(f"[features] dropping object-typed columns (lists should be split): {obj_cols}")
         df = df.drop(columns=obj_cols)
 
-    df.to_parquet(out_path, index=False)
+    write_parquet(df, out_path)
     if verbose:
         print(f"[features] → {out_path} rows={len(df)} cols={len(df.columns)}")
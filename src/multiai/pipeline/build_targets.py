@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from multiai.dataops.parquet_io import read_columns, write_parquet
+
 def run_build_targets(merged_path: str, out_path: str, price_col: str = "trade_price",
                       horizons=(10,30,60,90,120,240), verbose: bool=False):
     """
@@ -8,7 +10,9 @@ def run_build_targets(merged_path: str, out_path: str, price_col: str = "trade_p
     Targets: target_ret_{H}s for H in horizons.
     Rows that cannot compute all horizons are dropped (causality-safe).
     """
-    df = pd.read_parquet(merged_path)
+    # Only the timestamp and the price (or its fallbacks) are needed.
+    wanted = {"timestamp", price_col, "mid_price", "best_bid", "best_ask"}
+    df = read_columns(merged_path, wanted.__contains__)
     if "timestamp" not in df.columns:
         raise ValueError("timestamp column missing in merged file")
     if price_col not in df.columns:
@@ -21,16 +25,24 @@ def run_build_targets(merged_path: str, out_path: str, price_col: str = "trade_p
         else:
             raise ValueError(f"Price column '{price_col}' not found and cannot be synthesized from best_bid/best_ask.")
 
-    df = df.sort_values("timestamp").reset_index(drop=True)
-    p = df[price_col].astype(float)
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp").reset_index(drop=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logp = np.log(df[price_col].to_numpy(dtype=np.float64))
+    n = len(logp)
 
-    for h in horizons:
-        # forward log-return over h seconds
-        df[f"target_ret_{h}s"] = np.log(p.shift(-h) / p)
+    # forward log-return over h seconds: log p[t+h] - log p[t], one slice
+    # subtraction per horizon; rows without a full horizon stay NaN
+    target_cols = [f"target_ret_{h}s" for h in horizons]
+    targets = np.full((n, len(target_cols)), np.nan)
+    for j, h in enumerate(horizons):
+        m = max(n - h, 0)
+        targets[:m, j] = logp[n - m:] - logp[:m]
 
     # drop rows with any NaN target (strictly causal; no peeking)
-    target_cols = [f"target_ret_{h}s" for h in horizons]
-    out = df[["timestamp"] + target_cols].dropna().reset_index(drop=True)
-    out.to_parquet(out_path, index=False)
+    keep = ~np.isnan(targets).any(axis=1)
+    out = pd.DataFrame(targets[keep], columns=target_cols)
+    out.insert(0, "timestamp", df["timestamp"].to_numpy()[keep])
+    write_parquet(out, out_path)
     if verbose:
         print(f"[targets] → {out_path} rows={len(out)} cols={len(out.columns)}")
@@ -1,10 +1,15 @@
 import glob
 import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from multiai.dataops.quantize import quantize_to_1s
 from multiai.dataops.split_object_columns import split_object_columns_if_present
 from multiai.dataops.merge_on_off import merge_on_off
+from multiai.dataops.parquet_io import write_parquet
 
 OBJECT_COLS = [
     "orderbook_bid", "orderbook_ask",
@@ -16,8 +21,15 @@ def _read_concat_parquets(folder: str) -> pd.DataFrame:
     files = sorted(glob.glob(os.path.join(folder, "*.parquet")))
     if not files:
         raise FileNotFoundError(f"No parquet files in {folder}")
-    dfs = [pd.read_parquet(p) for p in files]
-    return pd.concat(dfs, ignore_index=True)
+    # One threaded scan over every file's row groups; footers are unified first
+    # so files whose columns drift (new fields, all-null batches) still line up.
+    try:
+        schema = pa.unify_schemas([pq.read_schema(p) for p in files], promote_options="permissive")
+        table = ds.dataset(files, schema=schema, format="parquet").to_table(use_threads=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Schemas Arrow cannot reconcile: fall back to pandas' own upcasting.
+        return pd.concat([pd.read_parquet(p) for p in files], ignore_index=True)
+    return table.to_pandas(self_destruct=True, split_blocks=True).reset_index(drop=True)
 
 def run_daily_merge(off_dir: str, on_dir: str, out_path: str, verbose=False):
     if verbose:
@@ -33,11 +45,21 @@ def run_daily_merge(off_dir: str, on_dir: str, out_path: str, verbose=False):
 
     merged = merge_on_off(off_q, on_q, ts_col="timestamp")
 
-    if not merged["timestamp"].is_monotonic_increasing:
-        merged = merged.sort_values("timestamp").reset_index(drop=True)
-    merged = merged.drop_duplicates(subset=["timestamp"], keep="last")
+    # One np.diff pass shows the usual case (strictly increasing: sorted and
+    # duplicate-free); only otherwise sort and drop repeated timestamps.
+    ts = merged["timestamp"].to_numpy(dtype="datetime64[ns]").view("i8")
+    if len(ts) > 1 and np.diff(ts).min() <= 0:
+        if not merged["timestamp"].is_monotonic_increasing:
+            merged = merged.sort_values("timestamp").reset_index(drop=True)
+            ts = merged["timestamp"].to_numpy(dtype="datetime64[ns]").view("i8")
+        # Sorted, so duplicates are adjacent: keep the last row of each run
+        # with one int64 comparison instead of a hash-based drop_duplicates.
+        keep = np.empty(len(ts), dtype=bool)
+        keep[:-1] = ts[:-1] != ts[1:]
+        keep[-1] = True
+        merged = merged.iloc[keep]
 
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
-    merged.to_parquet(out_path, index=False)
+    write_parquet(merged, out_path)
     if verbose:
         print(f"[daily-merge] wrote {out_path} | rows={len(merged)}")
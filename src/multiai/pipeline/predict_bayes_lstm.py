@@ -1,28 +1,29 @@
 import os, json
-from math import erf, sqrt
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import torch
-from multiai.pipeline.train_bayes_lstm import MCDropoutLSTM, resolve_device
-from multiai.tools.kelly import kelly_optimal_fraction_gaussian
-from multiai.tools.combiner import combine_allocations
+from multiai.dataops.parquet_io import PARQUET_WRITE_OPTIONS, read_columns
+from multiai.pipeline.train_bayes_lstm import MCDropoutLSTM, compile_for_device, resolve_device
+from multiai.tools.kelly import gaussian_sign_probabilities, kelly_optimal_fraction_gaussian_batch
+from multiai.tools.combiner import combine_allocations_batch
 
-def _mc_predict_full(model, xb, mc_samples: int):
+def _mc_predict_full(model, xb, mc_samples: int, sample_heads=None):
     model.train()
-    mus = []
-    vars_ = []
+    sample_heads = sample_heads or model.sample_heads
+    # The forward runs under bf16 autocast on CUDA; the moment reductions
+    # below stay in fp32 so the epistemic variance keeps its precision.
     with torch.no_grad():
-        for _ in range(mc_samples):
-            mu, logvar = model(xb)
-            mus.append(mu.detach().cpu().numpy())
-            vars_.append(torch.exp(logvar).detach().cpu().numpy())
-    mus = np.stack(mus, axis=0)        # [S,B,H]
-    vars_ = np.stack(vars_, axis=0)    # [S,B,H]
-    mu_hat = mus.mean(axis=0)          # [B,H]
-    var_ep = mus.var(axis=0, ddof=1)   # [B,H]
-    var_al = vars_.mean(axis=0)        # [B,H]
-    sigma_hat = np.sqrt(var_ep + var_al)
-    return mu_hat, sigma_hat
+        with torch.autocast(device_type="cuda", dtype=torch.bfloat16, enabled=(xb.device.type == "cuda")):
+            mus, logvars = sample_heads(xb, mc_samples)     # [S,B,H]
+        mus = mus.float(); logvars = logvars.float()
+        mu_hat = mus.mean(dim=0)                            # [B,H]
+        var_ep = mus.var(dim=0, unbiased=True)              # [B,H]
+        var_al = torch.exp(logvars).mean(dim=0)             # [B,H]
+        sigma_hat = torch.sqrt(var_ep + var_al)
+    return mu_hat.cpu().numpy(), sigma_hat.cpu().numpy()
 
 def run_predict_bayes(features_path: str, model_dir: str, out_path: str,
                       seq_len: int, mc_samples: int, device: str,
@@ -35,71 +36,80 @@ def run_predict_bayes(features_path: str, model_dir: str, out_path: str,
     model = MCDropoutLSTM(in_dim=in_dim, hidden=96, num_layers=1, dropout=0.2, out_dim=out_dim)
     model.load_state_dict(torch.load(os.path.join(model_dir, "model.pt"), map_location=device))
     model.to(device)
+    sample_heads = compile_for_device(model.sample_heads, device)
 
-    fdf = pd.read_parquet(features_path).sort_values("timestamp")
-    X = fdf[meta["feature_columns"]].astype(float).to_numpy()
+    wanted = {"timestamp", *meta["feature_columns"]}
+    fdf = read_columns(features_path, wanted.__contains__)
+    if not fdf["timestamp"].is_monotonic_increasing:
+        fdf = fdf.sort_values("timestamp")
+    X = fdf[meta["feature_columns"]].to_numpy(dtype=np.float32)
     n = len(X)
     if n <= seq_len:
         raise RuntimeError("Not enough data for prediction; need > seq_len rows.")
+    # X crosses to the device once; windows[i] == X[i:i+seq_len] is a zero-copy
+    # strided view there: [N-seq_len+1, seq_len, F]
+    windows = torch.from_numpy(X).to(device).unfold(0, seq_len, 1).transpose(1, 2)
 
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
     batch = 1024
-    rows = []
-    for start in range(0, n - seq_len, batch):
-        end = min(n - seq_len, start + batch)
-        xs = np.stack([X[i:i+seq_len] for i in range(start, end)], axis=0).astype(np.float32, copy=False)
-        xb = torch.tensor(xs, dtype=torch.float32, device=device)
-
-        mu_hat, sigma_hat = _mc_predict_full(model, xb, mc_samples)
-        sigma_hat = sigma_hat * float(sigma_scale)
-        B, H = mu_hat.shape
-        out_idx = fdf.index[seq_len+start:seq_len+start+B]
-        base = pd.DataFrame({"timestamp": fdf.loc[out_idx, "timestamp"].values})
+    total = 0
+    writer = None
+    pending = None
+    # Chunks are written on a background thread while the next one is computed;
+    # at most one write is in flight, so memory stays O(batch) rather than O(N).
+    io_pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        for start in range(0, n - seq_len, batch):
+            end = min(n - seq_len, start + batch)
+            xb = windows[start:end].contiguous()
 
-        for j, h in enumerate(horizons[:H]):
-            mu = mu_hat[:, j]
-            sig = sigma_hat[:, j]
-            f_star = np.zeros(B); G_star = np.zeros(B); f_gauss = np.zeros(B)
-            prob_up = np.zeros(B)
-            prob_down = np.zeros(B)
-            for i in range(B):
-                f, G, fg = kelly_optimal_fraction_gaussian(
-                    float(mu[i]), float(sig[i]), cost_bps_per_leg, sl, tp, f_cap=1.0
-                )
-                f_star[i] = np.clip(f, -abs(kelly_cap), abs(kelly_cap))
-                G_star[i] = G
-                f_gauss[i] = fg
-                if sig[i] <= 1e-12:
-                    prob_down[i] = 0.5
-                    prob_up[i] = 0.5
-                else:
-                    z = (0.0 - float(mu[i])) / (float(sig[i]) * sqrt(2.0))
-                    cdf0 = 0.5 * (1.0 + erf(z))
-                    cdf0 = min(max(cdf0, 0.0), 1.0)
-                    prob_down[i] = cdf0
-                    prob_up[i] = 1.0 - cdf0
-            base[f"pred_mu_h{h}"] = mu
-            base[f"pred_sigma_h{h}"] = sig
-            base[f"kelly_weight_h{h}"] = f_star
-            base[f"kelly_G_h{h}"] = G_star
-            base[f"kelly_fgauss_h{h}"] = f_gauss
-            base[f"prob_up_h{h}"] = prob_up
-            base[f"prob_down_h{h}"] = prob_down
-            base[f"kelly_integral_h{h}"] = G_star
+            mu_hat, sigma_hat = _mc_predict_full(model, xb, mc_samples, sample_heads)
+            sigma_hat = sigma_hat * float(sigma_scale)
+            B, H = mu_hat.shape
+            out_idx = fdf.index[seq_len+start:seq_len+start+B]
 
-        fcols = [c for c in base.columns if c.startswith('kelly_weight_h')]
-        if fcols:
-            F = base[fcols].to_numpy()
-            S = base[[c.replace('kelly_weight', 'pred_sigma') for c in fcols]].to_numpy()
-            comb = [combine_allocations(F[i], S[i], cap=kelly_cap) for i in range(len(base))]
-            base['kelly_weighted'] = comb
-            if combine:
-                base['kelly_alloc'] = comb
-        rows.append(base)
-        if verbose:
-            print(f"[predict-bayes] chunk {start}-{end} rows={B} device={device}")
-
-    out = pd.concat(rows, ignore_index=True)
-    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
-    out.to_parquet(out_path, index=False)
+            cap = abs(kelly_cap)
+            # Every (B, H) cell goes through one batched Kelly search; the
+            # per-horizon outputs are then column slices of the result arrays.
+            f_all, G_all, fg_all = kelly_optimal_fraction_gaussian_batch(
+                mu_hat, sigma_hat, cost_bps_per_leg, sl, tp, f_cap=1.0
+            )
+            f_all = np.clip(f_all, -cap, cap)
+            up_all, down_all = gaussian_sign_probabilities(mu_hat, sigma_hat)
+            columns = {"timestamp": fdf.loc[out_idx, "timestamp"].values}
+            per_horizon = (
+                ("pred_mu_h", mu_hat),
+                ("pred_sigma_h", sigma_hat),
+                ("kelly_weight_h", f_all),
+                ("kelly_G_h", G_all),
+                ("kelly_fgauss_h", fg_all),
+                ("prob_up_h", up_all),
+                ("prob_down_h", down_all),
+                ("kelly_integral_h", G_all),
+            )
+            used = len(horizons[:H])
+            for j, h in enumerate(horizons[:used]):
+                columns.update((f"{prefix}{h}", values[:, j]) for prefix, values in per_horizon)
+            if used:
+                comb = combine_allocations_batch(f_all[:, :used], sigma_hat[:, :used], cap=kelly_cap)
+                columns['kelly_weighted'] = comb
+                if combine:
+                    columns['kelly_alloc'] = comb
+            base = pd.DataFrame(columns)
+            table = pa.Table.from_pandas(base, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema, **PARQUET_WRITE_OPTIONS)
+            if pending is not None:
+                pending.result()
+            pending = io_pool.submit(writer.write_table, table)
+            total += B
+            if verbose:
+                print(f"[predict-bayes] chunk {start}-{end} rows={B} device={device}")
+        if pending is not None:
+            pending.result()
+    finally:
+        io_pool.shutdown(wait=True)
+        if writer is not None:
+            writer.close()
     if verbose:
-        print(f"[predict-bayes] -> {out_path} rows={len(out)}")
+        print(f"[predict-bayes] -> {out_path} rows={total}")
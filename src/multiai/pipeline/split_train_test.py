@@ -1,7 +1,10 @@
 
 import os
+import numpy as np
 import pandas as pd
 
+from multiai.dataops.parquet_io import write_parquet
+
 def _detect_ts(df):
     candidates = ["ts","timestamp","time","event_time","datetime"]
     for c in candidates:
@@ -20,20 +23,24 @@ def run(in_path, out_train, out_test, ratio=0.8, split_timestamp=None):
     if ts_col is None:
         raise RuntimeError("no timestamp-like column found")
     df[ts_col] = pd.to_datetime(df[ts_col], utc=True, errors="coerce")
-    df = df.dropna(subset=[ts_col]).sort_values(ts_col).reset_index(drop=True)
+    df = df.dropna(subset=[ts_col])
+    if not df[ts_col].is_monotonic_increasing:
+        df = df.sort_values(ts_col)
+    df = df.reset_index(drop=True)
     if split_timestamp is not None:
-        split_ts = pd.to_datetime(split_timestamp, utc=True)
-        train = df[df[ts_col] < split_ts]
-        test = df[df[ts_col] >= split_ts]
+        # df is sorted, so the split point is a binary search, not two masks
+        split_ts = pd.to_datetime(split_timestamp, utc=True).tz_convert(None).to_datetime64()
+        k = int(np.searchsorted(df[ts_col].to_numpy(dtype="datetime64[ns]"), split_ts, side="left"))
     else:
         n = len(df)
         k = int(max(1, min(n-1, round(n * float(ratio)))))
-        train = df.iloc[:k].copy()
-        test = df.iloc[k:].copy()
+    # slices, not copies: the parquet writes below are the only copy
+    train = df.iloc[:k]
+    test = df.iloc[k:]
     os.makedirs(os.path.dirname(out_train) or ".", exist_ok=True)
     os.makedirs(os.path.dirname(out_test) or ".", exist_ok=True)
-    train.to_parquet(out_train, index=False)
-    test.to_parquet(out_test, index=False)
+    write_parquet(train, out_train)
+    write_parquet(test, out_test)
 
     try:
         from multiai.orchestrator import state as st
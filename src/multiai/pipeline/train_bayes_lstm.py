@@ -4,7 +4,8 @@ import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
+
+from multiai.dataops.parquet_io import read_columns
 
 def resolve_device(requested: str) -> str:
     if requested == "auto":
@@ -15,6 +16,22 @@ def resolve_device(requested: str) -> str:
         return "cpu"
     return requested
 
+def compile_for_device(fn, device: str):
+    """torch.compile ``fn`` on CUDA (with cuDNN autotuning); elsewhere return it as is.
+
+    Compiling a module wraps it, so callers keep the original for state_dict().
+    """
+    if device != "cuda" or not hasattr(torch, "compile"):
+        return fn
+    torch.backends.cudnn.benchmark = True
+    return torch.compile(fn, mode="reduce-overhead")
+
+def gaussian_nll(mu, logvar, y):
+    """Mean heteroscedastic Gaussian NLL (up to the constant term)."""
+    var = torch.exp(logvar).clamp_min(1e-8)
+    diff = y - mu
+    return 0.5 * (diff * diff / var + logvar).mean()
+
 class MCDropoutLSTM(nn.Module):
     def __init__(self, in_dim: int, hidden: int = 96, num_layers: int = 1, dropout: float = 0.2, out_dim: int = 6):
         super().__init__()
@@ -30,22 +47,42 @@ class MCDropoutLSTM(nn.Module):
         mu = y[..., 0]
         logvar = y[..., 1]
         return mu, logvar
+    def sample_heads(self, x, samples: int):
+        """MC-dropout draws in one pass: dropout only follows the LSTM, so the LSTM
+        runs once and just the dropout mask and head are resampled per draw.
+        Returns mu, logvar shaped [samples, B, out_dim]."""
+        y, _ = self.lstm(x)
+        last = y[:, -1, :].unsqueeze(0).expand(samples, -1, -1)
+        y = self.head(self.dropout(last)).view(samples, -1, self.out_dim, 2)
+        return y[..., 0], y[..., 1]
+
+class SeqWindows:
+    """Sliding (X[i:i+seq_len], Y[i+seq_len]) samples held on the device.
 
-class SeqDataset(Dataset):
-    def __init__(self, X: np.ndarray, Y: np.ndarray, seq_len: int):
-        self.X = X.astype(np.float32, copy=False)
-        self.Y = Y.astype(np.float32, copy=False)
+    X and Y are transferred once; windows are a strided view over X, and
+    each batch is a single gather instead of per-item __getitem__ calls.
+    Unlike the DataLoader it replaces, the whole split lives in device
+    memory for the run, so very large training sets need a streaming loader.
+    """
+    def __init__(self, X: np.ndarray, Y: np.ndarray, seq_len: int, device: str):
         self.seq_len = int(seq_len)
         self.N = len(X) - self.seq_len
         if self.N <= 0:
             raise RuntimeError("Not enough data for the chosen seq_len")
+        X = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+        Y = torch.from_numpy(np.ascontiguousarray(Y, dtype=np.float32))
+        if device == "cuda":
+            X = X.pin_memory(); Y = Y.pin_memory()
+        self.device = device
+        self.windows = X.to(device, non_blocking=True).unfold(0, self.seq_len, 1).transpose(1, 2)
+        self.Y = Y.to(device, non_blocking=True)
     def __len__(self):
         return self.N
-    def __getitem__(self, i):
-        j = i + self.seq_len
-        xb = self.X[i:j]
-        yb = self.Y[j]
-        return torch.from_numpy(xb), torch.from_numpy(yb)
+    def batches(self, batch_size: int, shuffle: bool):
+        order = torch.randperm(self.N, device=self.device) if shuffle else torch.arange(self.N, device=self.device)
+        for i in range(0, self.N, batch_size):
+            idx = order[i:i + batch_size]
+            yield self.windows[idx], self.Y[idx + self.seq_len]
 
 def run_train_bayes(features_path: str, targets_path: str, outdir: str,
                     seq_len: int, epochs: int, batch_size: int, lr: float,
@@ -55,8 +92,13 @@ def run_train_bayes(features_path: str, targets_path: str, outdir: str,
     if verbose:
         print(f"[train-bayes] device={device}")
 
-    fdf = pd.read_parquet(features_path).sort_values("timestamp")
-    tdf = pd.read_parquet(targets_path).sort_values("timestamp")
+    fdf = pd.read_parquet(features_path)
+    tdf = read_columns(targets_path, lambda c: c == "timestamp" or c.startswith("target_ret_"))
+    # Upstream stages write timestamp-sorted files; only sort when that does not hold.
+    if not fdf["timestamp"].is_monotonic_increasing:
+        fdf = fdf.sort_values("timestamp")
+    if not tdf["timestamp"].is_monotonic_increasing:
+        tdf = tdf.sort_values("timestamp")
 
     if "timestamp" in fdf.columns and "timestamp" in tdf.columns:
         df = fdf.merge(tdf, on="timestamp", how="inner")
@@ -64,10 +106,17 @@ def run_train_bayes(features_path: str, targets_path: str, outdir: str,
         df = fdf.join(tdf, how="inner")
 
     target_cols = [c for c in df.columns if c.startswith("target_ret_")]
-    feat_df = df.drop(columns=[c for c in df.columns if c in target_cols or c=="timestamp"])
-    feat_df = feat_df.select_dtypes(include=[np.number]).fillna(0.0)
-
-    X = feat_df.to_numpy(dtype=np.float32, copy=False)
+    feature_cols = [
+        c for c in df.columns
+        if c not in target_cols and c != "timestamp"
+        and pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+    ]
+    # Fill one float32 buffer column by column and scrub NaNs in place, rather
+    # than drop/select_dtypes/fillna copies of the whole frame first.
+    X = np.empty((len(df), len(feature_cols)), dtype=np.float32)
+    for j, col in enumerate(feature_cols):
+        X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    np.copyto(X, 0.0, where=np.isnan(X))
     # Keep horizons in canonical order if present
     horizons = [10,30,60,90,120,240]
     Ycols = [f"target_ret_{h}s" for h in horizons if f"target_ret_{h}s" in df.columns]
@@ -82,50 +131,47 @@ def run_train_bayes(features_path: str, targets_path: str, outdir: str,
     Xtr, Xva = X[:split], X[split:]
     Ytr, Yva = Y[:split], Y[split:]
 
-    tr_ds = SeqDataset(Xtr, Ytr, seq_len)
-    va_ds = SeqDataset(Xva, Yva, seq_len)
-    tr_dl = DataLoader(tr_ds, batch_size=min(batch_size, 512), shuffle=True,
-                       num_workers=2, pin_memory=(device=="cuda"))
-    va_dl = DataLoader(va_ds, batch_size=min(batch_size, 512), shuffle=False,
-                       num_workers=2, pin_memory=(device=="cuda"))
+    tr_ds = SeqWindows(Xtr, Ytr, seq_len, device)
+    va_ds = SeqWindows(Xva, Yva, seq_len, device)
+    batch = min(batch_size, 512)
 
     model = MCDropoutLSTM(in_dim=X.shape[1], hidden=96, num_layers=1, dropout=0.2, out_dim=out_dim).to(device)
+    net = compile_for_device(model, device)
+    # Compiled separately so the elementwise loss chain fuses into one kernel.
+    nll = compile_for_device(gaussian_nll, device)
     opt = torch.optim.Adam(model.parameters(), lr=lr)
 
     scaler = torch.cuda.amp.GradScaler(enabled=(device=="cuda"))
 
-    def step_epoch(loader, train=True):
+    def step_epoch(ds, train=True):
         if train:
             model.train()
         else:
             model.eval()
-        total = 0.0
+        total = torch.zeros((), device=device)
         count = 0
-        for xb, yb in loader:
-            xb = xb.to(device, non_blocking=(device=="cuda"))
-            yb = yb.to(device, non_blocking=(device=="cuda"))
+        for xb, yb in ds.batches(batch, shuffle=train):
             if train:
                 opt.zero_grad(set_to_none=True)
                 with torch.cuda.amp.autocast(enabled=(device=="cuda")):
-                    mu, logvar = model(xb)
-                    var = torch.exp(logvar).clamp_min(1e-8)
-                    loss = 0.5 * ((yb - mu)**2 / var + logvar).mean()
+                    mu, logvar = net(xb)
+                    loss = nll(mu, logvar, yb)
                 scaler.scale(loss).backward()
                 scaler.step(opt)
                 scaler.update()
             else:
                 with torch.no_grad():
-                    mu, logvar = model(xb)
-                    var = torch.exp(logvar).clamp_min(1e-8)
-                    loss = 0.5 * ((yb - mu)**2 / var + logvar).mean()
-            total += loss.item() * xb.size(0)
+                    mu, logvar = net(xb)
+                    loss = nll(mu, logvar, yb)
+            # Accumulate on the device; one sync per epoch instead of per batch.
+            total += loss.detach().float() * xb.size(0)
             count += xb.size(0)
-        return total / max(1, count)
+        return total.item() / max(1, count)
 
     best = float("inf")
     for ep in range(epochs):
-        tr = step_epoch(tr_dl, train=True)
-        va = step_epoch(va_dl, train=False)
+        tr = step_epoch(tr_ds, train=True)
+        va = step_epoch(va_ds, train=False)
         if verbose:
             print(f"[train-bayes] epoch {ep+1}/{epochs} train={tr:.6f} val={va:.6f}")
         if va < best:
@@ -136,7 +182,7 @@ def run_train_bayes(features_path: str, targets_path: str, outdir: str,
                 "out_dim": out_dim,
                 "seq_len": int(seq_len),
                 "horizons": [int(c.split('_')[2].rstrip('s')) for c in Ycols],
-                "feature_columns": feat_df.columns.tolist()
+                "feature_columns": feature_cols
             }
             with open(os.path.join(outdir, "meta.json"), "w") as f:
                 json.dump(meta, f, indent=2)
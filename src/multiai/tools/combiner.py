@@ -5,3 +5,11 @@ def combine_allocations(f_by_h, sigma_by_h, cap=0.2, eps=1e-12):
     w = w / np.maximum(w.sum(), eps)
     f = (w * f_by_h).sum()
     return float(np.clip(f, -abs(cap), abs(cap)))
+
+def combine_allocations_batch(F, S, cap=0.2, eps=1e-12):
+    """Row-wise combine_allocations for (rows, horizons) arrays."""
+    sig2 = np.maximum(S**2, eps)
+    w = 1.0 / sig2
+    w = w / np.maximum(w.sum(axis=-1, keepdims=True), eps)
+    f = (w * F).sum(axis=-1)
+    return np.clip(f, -abs(cap), abs(cap))
@@ -0,0 +1,15 @@
+"""Optional Numba JIT; without numba installed the decorated functions run as plain Python."""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba is an optional extra
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+__all__ = ["NUMBA_AVAILABLE", "njit", "prange"]
@@ -1,20 +1,42 @@
+import math
 import numpy as np
 from typing import Tuple
 
-def _grid_expect_log_growth(mu: float, sigma: float, f: float, cost_bps_roundtrip: float,
-                            sl: float, tp: float, n_grid: int = 201) -> float:
+from multiai.tools.jit import NUMBA_AVAILABLE, njit, prange
+
+try:
+    from scipy.special import ndtr as _ndtr
+except ImportError:  # pragma: no cover - scipy ships with the accel extra
+    _erf = np.vectorize(math.erf, otypes=[float])
+
+    def _ndtr(x):
+        return 0.5 * (1.0 + _erf(np.asarray(x, dtype=float) / math.sqrt(2.0)))
+
+def _prepare_grid(mu: float, sigma: float, cost_bps_roundtrip: float,
+                  sl: float, tp: float, n_grid: int = 201) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalised truncated-Gaussian weights and net returns on the [-sl, tp] grid.
+
+    Neither depends on the fraction f, so a search builds them once.
+    """
     sigma = max(float(sigma), 1e-8)
     a = -abs(sl); b = abs(tp)
     xs = np.linspace(a, b, n_grid)
     pdf = np.exp(-0.5 * ((xs - mu)/sigma)**2) / (sigma * np.sqrt(2*np.pi))
     w = pdf / np.trapz(pdf, xs)
     costs = cost_bps_roundtrip / 10000.0
-    r_net = xs - costs
+    return w, xs - costs
+
+def _expect_log_growth(w: np.ndarray, r_net: np.ndarray, f: float) -> float:
     val = 1.0 + f * r_net
     if np.any(val <= 1e-12):
         return -1e9
     return float(np.sum(w * np.log(val)))
 
+def _grid_expect_log_growth(mu: float, sigma: float, f: float, cost_bps_roundtrip: float,
+                            sl: float, tp: float, n_grid: int = 201) -> float:
+    w, r_net = _prepare_grid(mu, sigma, cost_bps_roundtrip, sl, tp, n_grid)
+    return _expect_log_growth(w, r_net, f)
+
 def kelly_optimal_fraction_gaussian(mu: float, sigma: float,
                                     cost_bps_per_leg: float = 20.0,
                                     sl: float = 0.02, tp: float = 0.02,
@@ -27,7 +49,8 @@ def kelly_optimal_fraction_gaussian(mu: float, sigma: float,
     lo, hi = -abs(f_cap), abs(f_cap)
     c = hi - (hi - lo) / phi
     d = lo + (hi - lo) / phi
-    def G(f): return _grid_expect_log_growth(mu, sigma, f, cost_roundtrip, sl, tp, n_grid=201)
+    w, r_net = _prepare_grid(mu, sigma, cost_roundtrip, sl, tp, n_grid=201)
+    def G(f): return _expect_log_growth(w, r_net, f)
     fc, fd = G(c), G(d)
     for _ in range(80):
         if fc < fd:
@@ -39,3 +62,126 @@ def kelly_optimal_fraction_gaussian(mu: float, sigma: float,
     f_star = (lo + hi) / 2.0
     G_star = G(f_star)
     return float(f_star), float(G_star), float(f_gauss)
+
+@njit(cache=True, error_model="numpy")
+def _kelly_search_nb(mu, sigma, xs, r_net, f_cap):
+    """Scalar-loop golden-section search for one cell; same grid and update
+    rule as kelly_optimal_fraction_gaussian, without array temporaries.
+    error_model="numpy" keeps NaN/inf propagation (e.g. an underflowed pdf)."""
+    n = xs.shape[0]
+    s = max(sigma, 1e-8)
+    norm = s * math.sqrt(2 * math.pi)
+    w = np.empty(n)
+    for k in range(n):
+        z = (xs[k] - mu) / s
+        w[k] = math.exp(-0.5 * z * z) / norm
+    area = 0.0
+    for k in range(n - 1):
+        area += (xs[k + 1] - xs[k]) * (w[k + 1] + w[k]) / 2.0
+    for k in range(n):
+        w[k] /= area
+
+    phi = (1 + 5**0.5) / 2
+    lo = -abs(f_cap); hi = abs(f_cap)
+    c = hi - (hi - lo) / phi
+    d = lo + (hi - lo) / phi
+    fc = _log_growth_nb(w, r_net, c); fd = _log_growth_nb(w, r_net, d)
+    for _ in range(80):
+        if fc < fd:
+            lo = c; c = d; fc = fd; d = lo + (hi - lo) / phi; fd = _log_growth_nb(w, r_net, d)
+        else:
+            hi = d; d = c; fd = fc; c = hi - (hi - lo) / phi; fc = _log_growth_nb(w, r_net, c)
+        if abs(hi - lo) < 1e-4:
+            break
+    f_star = (lo + hi) / 2.0
+    return f_star, _log_growth_nb(w, r_net, f_star)
+
+@njit(cache=True, error_model="numpy")
+def _log_growth_nb(w, r_net, f):
+    total = 0.0
+    for k in range(w.shape[0]):
+        val = 1.0 + f * r_net[k]
+        if val <= 1e-12:
+            return -1e9
+        total += w[k] * math.log(val)
+    return total
+
+@njit(cache=True, parallel=True, error_model="numpy")
+def _kelly_batch_nb(mu, sigma, xs, r_net, f_cap, f_out, g_out):
+    for i in prange(mu.shape[0]):
+        f_out[i], g_out[i] = _kelly_search_nb(mu[i], sigma[i], xs, r_net, f_cap)
+
+def kelly_optimal_fraction_gaussian_batch(mu, sigma,
+                                          cost_bps_per_leg: float = 20.0,
+                                          sl: float = 0.02, tp: float = 0.02,
+                                          f_cap: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Elementwise kelly_optimal_fraction_gaussian over arrays of mu/sigma.
+
+    Runs the same golden-section search for every element at once; each
+    element stops updating as soon as its own bracket has converged.
+    """
+    mu, sigma = np.broadcast_arrays(np.asarray(mu, dtype=float), np.asarray(sigma, dtype=float))
+    shape = mu.shape
+    mu = mu.ravel(); sigma = sigma.ravel()
+    f_star = np.zeros(mu.size); G_star = np.zeros(mu.size); f_gauss = np.zeros(mu.size)
+    live = ~(sigma <= 1e-12)
+    if not live.any():
+        return f_star.reshape(shape), G_star.reshape(shape), f_gauss.reshape(shape)
+
+    m = mu[live]; s = sigma[live]
+    f_gauss[live] = m / (s * s)
+    xs = np.linspace(-abs(sl), abs(tp), 201)
+    if NUMBA_AVAILABLE:
+        # Compiled per-cell searches spread over all cores via prange.
+        r_net = xs - (2.0 * cost_bps_per_leg) / 10000.0
+        f_live = np.empty(m.size); g_live = np.empty(m.size)
+        _kelly_batch_nb(m, s, xs, r_net, float(f_cap), f_live, g_live)
+        f_star[live] = f_live; G_star[live] = g_live
+        return f_star.reshape(shape), G_star.reshape(shape), f_gauss.reshape(shape)
+
+    s = np.maximum(s, 1e-8)
+    pdf = np.exp(-0.5 * ((xs - m[:, None]) / s[:, None])**2) / (s[:, None] * np.sqrt(2*np.pi))
+    w = pdf / np.trapz(pdf, xs, axis=1)[:, None]
+    r_net = xs - (2.0 * cost_bps_per_leg) / 10000.0
+
+    def G(idx, f):
+        val = 1.0 + f[:, None] * r_net
+        bad = np.any(val <= 1e-12, axis=1)
+        out = np.sum(w[idx] * np.log(np.where(val > 1e-12, val, 1.0)), axis=1)
+        return np.where(bad, -1e9, out)
+
+    phi = (1 + 5**0.5) / 2
+    n = m.size
+    lo = np.full(n, -abs(f_cap)); hi = np.full(n, abs(f_cap))
+    c = hi - (hi - lo) / phi
+    d = lo + (hi - lo) / phi
+    everyone = np.arange(n)
+    fc, fd = G(everyone, c), G(everyone, d)
+    idx = everyone
+    for _ in range(80):
+        left = fc[idx] < fd[idx]
+        c_old, d_old = c[idx], d[idx]
+        lo[idx] = np.where(left, c_old, lo[idx])
+        hi[idx] = np.where(left, hi[idx], d_old)
+        width = hi[idx] - lo[idx]
+        c[idx] = np.where(left, d_old, hi[idx] - width / phi)
+        d[idx] = np.where(left, lo[idx] + width / phi, c_old)
+        probe = G(idx, np.where(left, d[idx], c[idx]))
+        fc_old = fc[idx]
+        fc[idx] = np.where(left, fd[idx], probe)
+        fd[idx] = np.where(left, probe, fc_old)
+        idx = idx[np.abs(hi[idx] - lo[idx]) >= 1e-4]
+        if idx.size == 0:
+            break
+    f_mid = (lo + hi) / 2.0
+    f_star[live] = f_mid
+    G_star[live] = G(everyone, f_mid)
+    return f_star.reshape(shape), G_star.reshape(shape), f_gauss.reshape(shape)
+
+def gaussian_sign_probabilities(mu, sigma) -> Tuple[np.ndarray, np.ndarray]:
+    """Elementwise (P[r > 0], P[r <= 0]) for r ~ N(mu, sigma); 0.5/0.5 where sigma is degenerate."""
+    mu = np.asarray(mu, dtype=float); sigma = np.asarray(sigma, dtype=float)
+    valid = np.isfinite(mu) & np.isfinite(sigma) & (sigma > 1e-12)
+    z = np.divide(-mu, sigma, out=np.zeros(np.broadcast(mu, sigma).shape), where=valid)
+    prob_down = np.where(valid, np.clip(_ndtr(z), 0.0, 1.0), 0.5)
+    return 1.0 - prob_down, prob_down
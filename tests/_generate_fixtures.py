@@ -0,0 +1,59 @@
+"""Regenerate the deterministic (seed=42) pipeline input fixtures under tests/data/.
+
+Run from the repo root: ``python -m tests._generate_fixtures``.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+FIXTURE_FILES = {
+    "off_chain": "off_400.parquet",
+    "on_chain": "on_400.parquet",
+    "whales": "whales_400.parquet",
+}
+
+
+def build_frames(periods: int = 400) -> dict:
+    rng = np.random.default_rng(42)
+    timestamps = pd.date_range("2025-01-01", periods=periods, freq="s", tz="UTC")
+    price = 100 + np.cumsum(rng.normal(0, 0.05, size=periods))
+    off_df = pd.DataFrame({
+        "timestamp": timestamps,
+        "trade_price": price,
+        "best_bid": price - 0.01,
+        "best_ask": price + 0.01,
+        "volume": rng.lognormal(mean=0.0, sigma=0.1, size=periods),
+    })
+    on_df = pd.DataFrame({
+        "timestamp": timestamps,
+        "onchain_tx_count": rng.poisson(5, size=periods),
+        "onchain_avg_fee": rng.normal(0.05, 0.005, size=periods),
+    })
+    whale_counts = rng.integers(0, 3, size=periods)
+    whale_totals = rng.uniform(0.0, 200.0, size=periods)
+    whale_avg = np.divide(whale_totals, whale_counts, out=np.zeros(periods), where=whale_counts > 0)
+    whales_df = pd.DataFrame({
+        "timestamp": timestamps,
+        "whale_tx_count_10m": whale_counts,
+        "whale_total_value_ltc_10m": whale_totals,
+        "whale_avg_value_ltc_10m": whale_avg,
+        "whale_max_value_ltc_10m": np.maximum(whale_totals * 0.6, whale_avg),
+        "whale_topN_sum_ltc_10m": whale_totals * 0.8,
+    })
+    return {"off_chain": off_df, "on_chain": on_df, "whales": whales_df}
+
+
+def main() -> None:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    for name, df in build_frames().items():
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, DATA_DIR / FIXTURE_FILES[name], compression="zstd", compression_level=1)
+
+
+if __name__ == "__main__":
+    main()
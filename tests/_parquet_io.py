@@ -0,0 +1,20 @@
+"""Lean parquet helpers for test artifacts: uncompressed writes, metadata-only checks."""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def write(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table, path, compression="none", use_dictionary=False, write_statistics=False, data_page_size=1 << 20
+    )
+    return path
+
+
+def num_rows(path) -> int:
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def columns(path) -> list:
+    return pq.read_schema(path).names
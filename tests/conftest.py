@@ -1,5 +1,59 @@
 import os, sys
+import shutil
+from dataclasses import dataclass
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SRC  = os.path.join(ROOT, "src")
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
+
+
+@dataclass(frozen=True)
+class SyntheticFrames:
+    """Parquet paths of the deterministic (seed=42) 1s pipeline inputs."""
+
+    off_chain: Path
+    on_chain: Path
+    whales: Path
+
+    @staticmethod
+    def link(src: Path, dst: Path) -> Path:
+        """Hardlink a shared file into a test dir; copy when links are refused."""
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+        return dst
+
+
+@pytest.fixture(scope="session")
+def synthetic_frames() -> SyntheticFrames:
+    """Checked-in fixtures; regenerate with ``python -m tests._generate_fixtures``."""
+    from tests._generate_fixtures import DATA_DIR, FIXTURE_FILES
+
+    return SyntheticFrames(**{name: DATA_DIR / fname for name, fname in FIXTURE_FILES.items()})
+
+
+@pytest.fixture
+def fresh_orchestrator(tmp_path, monkeypatch) -> SimpleNamespace:
+    """Orchestrator state/queue/cli modules pointed at ``tmp_path`` without reloading them.
+
+    The env-derived module globals are patched (and restored after the test),
+    along with the env vars themselves for anything that reads them later.
+    """
+    from multiai.orchestrator import cli, queue, state
+
+    state_dir = tmp_path / "state"
+    queue_path = tmp_path / "queue.jsonl"
+    monkeypatch.setenv("MULTIAI_STATE_DIR", str(state_dir))
+    monkeypatch.setenv("MULTIAI_QUEUE_PATH", str(queue_path))
+    monkeypatch.setattr(state, "STATE_DIR", str(state_dir))
+    monkeypatch.setattr(state, "STATE_PATH", os.path.join(str(state_dir), "pipeline.json"))
+    monkeypatch.setattr(state, "_CACHE", None)
+    monkeypatch.setattr(state, "_CACHE_KEY", None)
+    monkeypatch.setattr(queue, "DEFAULT_QUEUE_PATH", str(queue_path))
+    return SimpleNamespace(state=state, queue=queue, cli=cli, queue_path=queue_path)
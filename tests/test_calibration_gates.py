@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "tools" / "calibration_gates.py"
+
+GATES_YML = """\
+thresholds:
+  coverage_min: 0.98
+  rows_min: 10
+required_pred_columns: {required}
+"""
+
+
+def _run(tmp_path, required):
+    (tmp_path / "policies").mkdir(exist_ok=True)
+    (tmp_path / "policies" / "gates.yml").write_text(GATES_YML.format(required=required), encoding="utf-8")
+    preds = pd.DataFrame({"timestamp": pd.date_range("2025-01-01", periods=20, freq="s")})
+    preds["pred_mu_h60"] = np.where(np.arange(20) < 5, np.nan, 0.0)
+    preds.to_parquet(tmp_path / "preds.parquet", index=False)
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), "features.parquet", "preds.parquet"],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+
+
+@pytest.mark.parametrize("required", ["[]", ""])
+def test_no_required_columns_passes(tmp_path, required):
+    result = _run(tmp_path, required)
+    assert result.returncode == 0, result.stderr
+    assert "OK: calibration gates passed" in result.stdout
+
+
+def test_low_coverage_fails(tmp_path):
+    result = _run(tmp_path, "[pred_mu_h60]")
+    assert result.returncode == 3
+    assert "FAIL: coverage 0.750" in result.stderr
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from multiai.tools import kelly
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning", "ignore::DeprecationWarning")
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_batch_matches_scalar_search(monkeypatch, use_numba):
+    if use_numba and not kelly.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(kelly, "NUMBA_AVAILABLE", use_numba)
+    rng = np.random.default_rng(7)
+    mu = np.concatenate([rng.normal(0.0, 0.01, 40), [0.0, np.nan, 0.01, np.inf, -np.inf, 0.01, 0.001]])
+    sigma = np.concatenate([np.abs(rng.normal(0.01, 0.01, 40)), [0.0, 0.01, np.nan, 0.01, 0.01, np.inf, 1e-13]])
+
+    f_star, g_star, f_gauss = kelly.kelly_optimal_fraction_gaussian_batch(
+        mu.reshape(1, -1), sigma.reshape(1, -1), cost_bps_per_leg=5.0, f_cap=0.8)
+    assert f_star.shape == (1, mu.size)
+    expected = np.array([
+        kelly.kelly_optimal_fraction_gaussian(m, s, cost_bps_per_leg=5.0, f_cap=0.8)
+        for m, s in zip(mu, sigma)
+    ])
+    for want, got in zip(expected.T, (f_star, g_star, f_gauss)):
+        np.testing.assert_allclose(got.ravel(), want, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.filterwarnings("error")
+def test_sign_probabilities_degenerate_inputs_are_even_and_silent():
+    mu = np.array([np.inf, -np.inf, np.nan, 0.01, 0.01, 0.01])
+    sigma = np.array([0.01, 0.01, 0.01, np.nan, 0.0, 0.02])
+    up, down = kelly.gaussian_sign_probabilities(mu, sigma)
+    np.testing.assert_allclose(up[:5], 0.5)
+    np.testing.assert_allclose(down[:5], 0.5)
+    assert up[5] > 0.5 and up[5] + down[5] == pytest.approx(1.0)
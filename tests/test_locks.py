@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from multiai.orchestrator.locks import LeaseManager, LeaseNotHeld, LeaseTimeout
+
+
+def _manager(tmp_path, **kwargs):
+    return LeaseManager(db_path=str(tmp_path / "locks.sqlite"), **kwargs)
+
+
+def test_acquire_renew_release_roundtrip(tmp_path):
+    mgr = _manager(tmp_path)
+    leases = mgr.acquire(["beta", "alpha", "alpha"], holder="job-1")
+    assert sorted(leases) == ["alpha", "beta"]
+    assert {l.shard for l in mgr.active()} == {"alpha", "beta"}
+
+    assert sorted(mgr.renew(tuple(leases), holder="job-1")) == ["alpha", "beta"]
+    renewed = mgr.renew(["alpha"], holder="job-1", ttl=5)
+    assert renewed["alpha"].ttl == 5
+    assert renewed["alpha"].acquired_at == leases["alpha"].acquired_at
+
+    with pytest.raises(LeaseNotHeld):
+        mgr.release(["alpha"], holder="job-2")
+    mgr.release(["alpha", "beta"], holder="job-1")
+    assert mgr.active() == []
+
+
+def test_contended_acquire_times_out_without_partial_grant(tmp_path):
+    mgr = _manager(tmp_path)
+    mgr.acquire(["beta"], holder="job-1")
+
+    started = time.monotonic()
+    with pytest.raises(LeaseTimeout, match="beta"):
+        mgr.acquire(["alpha", "beta"], holder="job-2", timeout=0.2, retry_interval=0.05)
+    assert time.monotonic() - started < 1.0
+    assert [l.shard for l in mgr.active()] == ["beta"]
+
+
+def test_expired_lease_can_be_taken_over(tmp_path):
+    mgr = _manager(tmp_path)
+    mgr.acquire(["alpha"], holder="job-1", ttl=0.05)
+    time.sleep(0.1)
+    leases = mgr.acquire(["alpha"], holder="job-2", timeout=0.5)
+    assert leases["alpha"].holder == "job-2"
+
+
+def test_in_memory_database_is_shared_between_reads_and_writes():
+    mgr = LeaseManager(db_path=":memory:")
+    mgr.acquire(["alpha"], holder="job-1")
+    assert [l.holder for l in mgr.active()] == ["job-1"]
+
+
+def test_expired_rows_written_elsewhere_do_not_block_release(tmp_path):
+    mgr = _manager(tmp_path)
+    other = _manager(tmp_path)
+    mgr.acquire(["alpha"], holder="job-1")
+    # mgr's expiry hint comes from its own long lease, so it will not purge beta.
+    other.acquire(["beta"], holder="job-2", ttl=0.05)
+    time.sleep(0.1)
+    mgr.release(["beta"], holder="job-1")
+    with pytest.raises(LeaseNotHeld):
+        mgr.renew(["beta"], holder="job-2")
+    assert [l.shard for l in mgr.active()] == ["alpha"]
+
+
+def test_failed_release_keeps_the_callers_other_leases(tmp_path):
+    mgr = _manager(tmp_path)
+    mgr.acquire(["alpha"], holder="job-1")
+    mgr.acquire(["beta"], holder="job-2")
+    with pytest.raises(LeaseNotHeld, match="beta"):
+        mgr.release(["alpha", "beta"], holder="job-1")
+    assert {(l.shard, l.holder) for l in mgr.active()} == {("alpha", "job-1"), ("beta", "job-2")}
+
+
+def test_acquire_deadline_ignores_wall_clock_jumps(tmp_path, monkeypatch):
+    mgr = _manager(tmp_path)
+    mgr.acquire(["alpha"], holder="job-1")
+    # Wall clock stuck in the past: a time.time() deadline would never pass.
+    monkeypatch.setattr(LeaseManager, "_now", staticmethod(lambda: 1.0))
+    started = time.monotonic()
+    with pytest.raises(LeaseTimeout):
+        mgr.acquire(["alpha"], holder="job-2", timeout=0.2, retry_interval=0.05)
+    assert time.monotonic() - started < 1.0
@@ -1,3 +1,4 @@
+import pytest
 import pandas as pd
 from multiai.dataops.merge_on_off import merge_on_off
 
@@ -43,3 +44,41 @@ def test_merge_with_whales():
         assert col in merged.columns
     assert merged['whale_tx_count_10m'].tolist() == [0, 2]
     assert not merged.isna().any().any()
+
+
+def test_merge_polars_backend_matches_pandas(monkeypatch):
+    pytest.importorskip("polars")
+    ts = pd.to_datetime(['2025-01-01T00:00:01Z', '2025-01-01T00:00:02Z', '2025-01-01T00:00:03Z'], utc=True)
+    off = pd.DataFrame({'timestamp': ts, 'price': [1.0, 2.0, 3.0]})
+    on = pd.DataFrame({'timestamp': ts[1:], 'price': [20.0, 30.0]})
+    whales = pd.DataFrame({'timestamp': ts[2:], 'whale_tx_count_10m': [4.0]})
+
+    expected = merge_on_off(off, on, whales)
+    monkeypatch.setenv('MULTIAI_DF_BACKEND', 'polars')
+    merged = merge_on_off(off, on, whales)
+
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+
+
+def test_merge_polars_backend_matches_pandas_on_unsorted_duplicate_keys(monkeypatch):
+    pytest.importorskip("polars")
+    ts = pd.to_datetime([f'2025-01-01T00:00:{s:02d}Z' for s in range(8)], utc=True)
+    off = pd.DataFrame({
+        'timestamp': ts[[5, 1, 3, 3, 0, 7, 2, 6, 4]],
+        'price': [5.0, 1.0, 3.0, 3.5, 0.0, 7.0, 2.0, 6.0, 4.0],
+    })
+    on = pd.DataFrame({
+        'timestamp': ts[[6, 2, 7, 0, 3, 5, 1, 4, 5]],
+        'price': [60.0, 20.0, 70.0, 0.0, 30.0, 50.0, 10.0, 40.0, 55.0],
+    })
+    whales = pd.DataFrame({
+        'timestamp': ts[[4, 1, 6, 1]],
+        'whale_tx_count_10m': [4.0, 1.0, 6.0, 2.0],
+        'threshold_ltc_effective': [40.0, 10.0, 60.0, 20.0],
+    })
+
+    expected = merge_on_off(off, on, whales)
+    monkeypatch.setenv('MULTIAI_DF_BACKEND', 'polars')
+    merged = merge_on_off(off, on, whales)
+
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
@@ -1,89 +1,43 @@
 import os
 import json
-import importlib
 
-import numpy as np
-import pandas as pd
 import pytest
 
-def test_orchestrator_pipeline_end_to_end(tmp_path, monkeypatch):
+from tests._parquet_io import columns as pq_columns, num_rows
+
+def test_orchestrator_pipeline_end_to_end(tmp_path, monkeypatch, synthetic_frames, fresh_orchestrator):
     pytest.importorskip("torch", reason="requires PyTorch for Bayesian LSTM pipeline")
 
-    state_dir = tmp_path / "state"
-    queue_path = tmp_path / "queue.jsonl"
-    monkeypatch.setenv("MULTIAI_STATE_DIR", str(state_dir))
-    monkeypatch.setenv("MULTIAI_QUEUE_PATH", str(queue_path))
     monkeypatch.chdir(tmp_path)
+    st, q, cli = fresh_orchestrator.state, fresh_orchestrator.queue, fresh_orchestrator.cli
+    queue_path = fresh_orchestrator.queue_path
 
-    from multiai.orchestrator import state as state_mod
-    from multiai.orchestrator import queue as queue_mod
-    from multiai.orchestrator import cli as cli_mod
-
-    st = importlib.reload(state_mod)
-    q = importlib.reload(queue_mod)
-    cli = importlib.reload(cli_mod)
-
-    rng = np.random.default_rng(42)
-    periods = 400
-    timestamps = pd.date_range("2025-01-01", periods=periods, freq="s", tz="UTC")
-    price = 100 + np.cumsum(rng.normal(0, 0.05, size=periods))
-    off_df = pd.DataFrame({
-        "timestamp": timestamps,
-        "trade_price": price,
-        "best_bid": price - 0.01,
-        "best_ask": price + 0.01,
-        "volume": rng.lognormal(mean=0.0, sigma=0.1, size=periods),
-    })
-    off_q1s_path = tmp_path / "off_chain_q1s.parquet"
-    off_split_path = tmp_path / "off_chain_q1s_split.parquet"
-    off_df.to_parquet(off_q1s_path, index=False)
-    off_df.to_parquet(off_split_path, index=False)
+    off_q1s_path = synthetic_frames.link(synthetic_frames.off_chain, tmp_path / "off_chain_q1s.parquet")
+    off_split_path = synthetic_frames.link(synthetic_frames.off_chain, tmp_path / "off_chain_q1s_split.parquet")
+    on_q1s_path = synthetic_frames.link(synthetic_frames.on_chain, tmp_path / "on_chain_q1s.parquet")
+    whales_path = synthetic_frames.link(synthetic_frames.whales, tmp_path / "whale_metrics_q1s.parquet")
     st.set_artifact("off_chain_q1s", str(off_q1s_path))
     st.set_artifact("off_chain_q1s_split", str(off_split_path))
-
-    on_df = pd.DataFrame({
-        "timestamp": timestamps,
-        "onchain_tx_count": rng.poisson(5, size=periods),
-        "onchain_avg_fee": rng.normal(0.05, 0.005, size=periods),
-    })
-    on_q1s_path = tmp_path / "on_chain_q1s.parquet"
-    on_df.to_parquet(on_q1s_path, index=False)
     st.set_artifact("on_chain_q1s", str(on_q1s_path))
-
-    whale_counts = rng.integers(0, 3, size=periods)
-    whale_totals = rng.uniform(0.0, 200.0, size=periods)
-    whale_avg = np.where(whale_counts > 0, whale_totals / whale_counts, 0.0)
-    whales_df = pd.DataFrame({
-        "timestamp": timestamps,
-        "whale_tx_count_10m": whale_counts,
-        "whale_total_value_ltc_10m": whale_totals,
-        "whale_avg_value_ltc_10m": whale_avg,
-        "whale_max_value_ltc_10m": np.maximum(whale_totals * 0.6, whale_avg),
-        "whale_topN_sum_ltc_10m": whale_totals * 0.8,
-    })
-    whales_path = tmp_path / "whale_metrics_q1s.parquet"
-    whales_df.to_parquet(whales_path, index=False)
     st.set_artifact("whale_metrics_q1s", str(whales_path))
     st.set_artifact("whale_metrics_q1s_split", str(whales_path))
 
-    for task_type, payload in cli.next_steps():
-        q.enqueue(task_type, payload, queue_path=str(queue_path))
+    q.enqueue_many(cli.next_steps(), queue_path=str(queue_path))
 
     processed = []
     while True:
-        task = q.dequeue(queue_path=str(queue_path))
-        if task is None:
+        tasks = q.drain(queue_path=str(queue_path))
+        if not tasks:
             break
-        assert cli.handle(task) is True
-        processed.append(task["type"])
+        assert all(cli.handle_many(tasks))
+        processed.extend(task["type"] for task in tasks)
 
     final_state = st.load()
     assert "data.merge_on_offchain" in processed
     assert "merged" in final_state
     merged_path = final_state["merged"]
     assert os.path.exists(merged_path)
-    merged_df = pd.read_parquet(merged_path)
-    assert "whale_tx_count_10m" in merged_df.columns
+    assert "whale_tx_count_10m" in pq_columns(merged_path)
 
     expected_keys = [
         "merged",
@@ -113,5 +67,4 @@ def test_orchestrator_pipeline_end_to_end(tmp_path, monkeypatch):
 
     assert q.length(queue_path=str(queue_path)) == 0
     # Ensure predictions parquet has rows
-    pred_df = pd.read_parquet(final_state["pred_path"])
-    assert len(pred_df) > 0
+    assert num_rows(final_state["pred_path"]) > 0
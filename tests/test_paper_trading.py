@@ -6,6 +6,7 @@ import pytest
 
 from multiai.paper_trading import PaperTradingSession, SessionConfig, run as run_session
 from multiai.tools.combiner import combine_allocations
+from tests._parquet_io import columns, num_rows, write
 
 
 def make_predictions(timestamps, mu_values, sigma_values):
@@ -65,8 +66,8 @@ def test_paper_trading_run_persists_artifacts(tmp_path):
 
     pred_path = tmp_path / "predictions.parquet"
     market_path = tmp_path / "market.parquet"
-    preds.to_parquet(pred_path, index=False)
-    market.to_parquet(market_path, index=False)
+    write(preds, pred_path)
+    write(market, market_path)
 
     out_dir = tmp_path / "paper"
     cfg = SessionConfig(duration_seconds=2, initial_capital=1_000.0)
@@ -76,9 +77,7 @@ def test_paper_trading_run_persists_artifacts(tmp_path):
     assert os.path.exists(result.equity_path)
     assert os.path.exists(result.alerts_path)
 
-    log_df = pd.read_parquet(result.log_path)
-    assert len(log_df) == 2
-    equity_df = pd.read_parquet(result.equity_path)
-    assert list(equity_df.columns) == ["timestamp", "equity"]
-    alerts_df = pd.read_parquet(result.alerts_path)
-    assert "timestamp" in alerts_df.columns and "type" in alerts_df.columns
+    assert num_rows(result.log_path) == 2
+    assert columns(result.equity_path) == ["timestamp", "equity"]
+    alert_cols = columns(result.alerts_path)
+    assert "timestamp" in alert_cols and "type" in alert_cols
@@ -0,0 +1,32 @@
+import pytest
+
+from multiai.orchestrator import prompt_guard
+from multiai.orchestrator.prompt_guard import PromptRejected, sanitize
+
+
+def test_default_patterns_use_combined_regex():
+    assert prompt_guard._compile_blocked(prompt_guard._BLOCKED_PATTERNS) is not None
+    assert sanitize("  summarize\x00 the report  ") == "summarize  the report"
+    with pytest.raises(PromptRejected, match="jailbreak"):
+        sanitize("please JAILBREAK the model")
+    with pytest.raises(PromptRejected, match="rm"):
+        sanitize("then sudo rm everything")
+
+
+def test_backreference_patterns_keep_their_group_numbers():
+    patterns = ["(x)y", r"(a)\1"]
+    assert prompt_guard._compile_blocked(tuple(patterns)) is None
+    with pytest.raises(PromptRejected, match=r"\(a\)\\1"):
+        sanitize("aa", blocked_patterns=patterns)
+    assert sanitize("ab", blocked_patterns=patterns) == "ab"
+
+
+def test_inline_flags_and_named_groups_fall_back_per_pattern():
+    with pytest.raises(PromptRejected, match="bar"):
+        sanitize("x BAR y", blocked_patterns=["(?i)foo", "bar"])
+    with pytest.raises(PromptRejected, match="foo"):
+        sanitize("FOO", blocked_patterns=["(?i)foo", "bar"])
+    named = ["(?P<w>cat)", "(?P<w>dog)"]
+    with pytest.raises(PromptRejected, match="dog"):
+        sanitize("hot dog", blocked_patterns=named)
+    assert sanitize("bird", blocked_patterns=named) == "bird"
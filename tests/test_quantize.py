@@ -16,3 +16,26 @@ def test_forward_round_and_latest_kept():
     assert out.iloc[0]["timestamp"].strftime("%H:%M:%S")=="00:00:01"
     assert out.iloc[0]["val"]==2
     assert out.iloc[1]["timestamp"].strftime("%H:%M:%S")=="00:00:02"
+
+
+def test_ceil_boundary_duplicates_unsorted_and_naive_input():
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime([
+            "2025-01-01 00:00:02.000",  # exact second stays at :02
+            "2025-01-01 00:00:00.500",
+            "2025-01-01 00:00:01.000",  # exact second stays at :01 and beats :00.500
+            "2025-01-01 00:00:02.300",
+            "2025-01-01 00:00:02.300",  # duplicate stamp: the later row wins
+            "2025-01-01 00:00:01.700",  # ceils to :02 but is older than the :02.000 row
+        ]),
+        "val": [10, 11, 12, 13, 14, 15],
+    })
+    out = quantize_to_1s(df, ts_col="timestamp")
+    assert list(out.columns) == ["val", "timestamp"]
+    assert list(out["timestamp"]) == list(pd.to_datetime([
+        "2025-01-01 00:00:01", "2025-01-01 00:00:02", "2025-01-01 00:00:03",
+    ]))
+    assert list(out["val"]) == [12, 10, 14]
+
+    aware = df.assign(timestamp=df["timestamp"].dt.tz_localize("UTC").dt.tz_convert("Asia/Tokyo"))
+    pd.testing.assert_frame_equal(quantize_to_1s(aware, ts_col="timestamp"), out)
@@ -0,0 +1,105 @@
+import json
+
+from multiai.orchestrator import queue as q
+
+
+def test_fifo_roundtrip_tracks_offset(tmp_path):
+    qp = str(tmp_path / "queue.jsonl")
+    for i in range(3):
+        q.enqueue("job", {"i": i}, queue_path=qp)
+    assert q.length(queue_path=qp) == 3
+
+    assert q.dequeue(queue_path=qp)["payload"] == {"i": 0}
+    assert q.length(queue_path=qp) == 2
+    q.enqueue("job", {"i": 3}, queue_path=qp)
+
+    got = [q.dequeue(queue_path=qp)["payload"]["i"] for _ in range(3)]
+    assert got == [1, 2, 3]
+    assert q.dequeue(queue_path=qp) is None
+    assert q.length(queue_path=qp) == 0
+
+
+def test_malformed_lines_are_skipped(tmp_path):
+    qp = tmp_path / "queue.jsonl"
+    qp.write_text("not json\n\n" + json.dumps({"type": "ok", "payload": {}}) + "\n", encoding="utf-8")
+    assert q.dequeue(queue_path=str(qp))["type"] == "ok"
+    assert q.dequeue(queue_path=str(qp)) is None
+
+
+def test_consumed_prefix_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(q, "COMPACT_MIN_BYTES", 1)
+    qp = tmp_path / "queue.jsonl"
+    for i in range(4):
+        q.enqueue("job", {"i": i}, queue_path=str(qp))
+    q.dequeue(queue_path=str(qp))
+    q.dequeue(queue_path=str(qp))
+    lines = qp.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(ln)["payload"]["i"] for ln in lines] == [2, 3]
+    assert q.dequeue(queue_path=str(qp))["payload"] == {"i": 2}
+
+
+def test_enqueue_many_appends_in_order(tmp_path):
+    qp = str(tmp_path / "logs" / "queue.jsonl")
+    assert q.enqueue_many([], queue_path=qp) == []
+    records = q.enqueue_many([("a", {"i": 0}), ("b", None)], queue_path=qp)
+    assert [r["type"] for r in records] == ["a", "b"]
+    q.enqueue("c", {"i": 2}, queue_path=qp)
+
+    assert q.length(queue_path=qp) == 3
+    got = [q.dequeue(queue_path=qp) for _ in range(3)]
+    assert [(r["type"], r["payload"]) for r in got] == [("a", {"i": 0}), ("b", {}), ("c", {"i": 2})]
+
+
+def test_drain_pops_all_complete_records(tmp_path):
+    qp = tmp_path / "queue.jsonl"
+    assert q.drain(queue_path=str(qp)) == []
+    q.enqueue_many([("job", {"i": i}) for i in range(3)], queue_path=str(qp))
+    assert q.dequeue(queue_path=str(qp))["payload"] == {"i": 0}
+
+    assert [r["payload"]["i"] for r in q.drain(queue_path=str(qp))] == [1, 2]
+    assert qp.stat().st_size == 0
+    assert q.dequeue(queue_path=str(qp)) is None
+
+    q.enqueue("job", {"i": 3}, queue_path=str(qp))
+    with open(qp, "a", encoding="utf-8") as fh:
+        fh.write('{"type": "partial"')
+    assert [r["payload"]["i"] for r in q.drain(queue_path=str(qp))] == [3]
+    assert q.drain(queue_path=str(qp)) == []
+    with open(qp, "a", encoding="utf-8") as fh:
+        fh.write(', "payload": {}}\n')
+    assert [r["type"] for r in q.drain(queue_path=str(qp))] == ["partial"]
+
+
+def test_unterminated_final_record_is_consumed(tmp_path):
+    qp = tmp_path / "queue.jsonl"
+    qp.write_text('{"type":"a"}\n{"type":"b"}', encoding="utf-8")
+    assert q.length(queue_path=str(qp)) == 2
+    assert q.dequeue(queue_path=str(qp))["type"] == "a"
+    assert q.length(queue_path=str(qp)) == 1
+    assert q.dequeue(queue_path=str(qp))["type"] == "b"
+    assert q.length(queue_path=str(qp)) == 0
+    assert q.dequeue(queue_path=str(qp)) is None
+
+    qp = tmp_path / "drain.jsonl"
+    qp.write_text('{"type":"c"}\n{"type":"d"}', encoding="utf-8")
+    assert [r["type"] for r in q.drain(queue_path=str(qp))] == ["c", "d"]
+    assert qp.stat().st_size == 0
+
+    qp = tmp_path / "partial.jsonl"
+    qp.write_text('{"type":"e"}\n{"type": "partial"', encoding="utf-8")
+    assert q.length(queue_path=str(qp)) == 1
+    assert q.dequeue(queue_path=str(qp))["type"] == "e"
+    assert q.length(queue_path=str(qp)) == 0
+    assert q.dequeue(queue_path=str(qp)) is None
+
+
+def test_offset_resets_when_queue_file_is_replaced(tmp_path):
+    qp = tmp_path / "queue.jsonl"
+    q.enqueue_many([("old", {"i": i}) for i in range(2)], queue_path=str(qp))
+    assert q.dequeue(queue_path=str(qp))["type"] == "old"
+
+    # Keep the old file alive so the new one cannot reuse its inode.
+    qp.rename(tmp_path / "queue.jsonl.bak")
+    q.enqueue_many([("new", {"i": i}) for i in range(5)], queue_path=str(qp))
+    assert q.length(queue_path=str(qp)) == 5
+    assert [q.dequeue(queue_path=str(qp))["payload"]["i"] for _ in range(5)] == [0, 1, 2, 3, 4]
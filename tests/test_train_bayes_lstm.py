@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from multiai.pipeline.train_bayes_lstm import MCDropoutLSTM, SeqWindows, gaussian_nll
+
+
+def test_seq_windows_unshuffled_batches_are_sliding_windows():
+    X = np.arange(40, dtype=np.float32).reshape(10, 4)
+    Y = -np.arange(20, dtype=np.float32).reshape(10, 2)
+    ds = SeqWindows(X, Y, seq_len=3, device="cpu")
+    assert len(ds) == 7
+
+    batches = list(ds.batches(batch_size=3, shuffle=False))
+    assert [len(xb) for xb, _ in batches] == [3, 3, 1]
+    xs = torch.cat([xb for xb, _ in batches])
+    ys = torch.cat([yb for _, yb in batches])
+    for i in range(len(ds)):
+        assert torch.equal(xs[i], torch.from_numpy(X[i:i + 3]))
+        assert torch.equal(ys[i], torch.from_numpy(Y[i + 3]))
+
+
+def test_sample_heads_in_eval_mode_matches_forward():
+    torch.manual_seed(0)
+    model = MCDropoutLSTM(in_dim=4, hidden=8, dropout=0.5, out_dim=3).eval()
+    x = torch.randn(5, 6, 4)
+    with torch.no_grad():
+        mu, logvar = model(x)
+        mu_s, logvar_s = model.sample_heads(x, samples=4)
+    assert mu_s.shape == logvar_s.shape == (4, 5, 3)
+    torch.testing.assert_close(mu_s, mu.expand(4, -1, -1))
+    torch.testing.assert_close(logvar_s, logvar.expand(4, -1, -1))
+
+
+def test_gaussian_nll_matches_inline_loss():
+    torch.manual_seed(1)
+    mu, logvar, y = torch.randn(3, 7, 6).unbind(0)
+    logvar[0, 0] = -40.0  # exercises the variance floor
+    var = torch.exp(logvar).clamp_min(1e-8)
+    expected = 0.5 * ((y - mu)**2 / var + logvar).mean()
+    torch.testing.assert_close(gaussian_nll(mu, logvar, y), expected)
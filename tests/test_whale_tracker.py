@@ -1,3 +1,5 @@
+import random
+
 import pandas as pd
 import pytest
 
@@ -109,3 +111,48 @@ def test_whale_tracker_detection_metrics_and_parquet(tmp_path):
     }
     assert expected_cols <= set(metrics_df.columns)
     assert (metrics_df["timestamp"] % 1000 == 0).all()
+
+
+def test_ring_buffer_matches_list_replay_through_compaction_and_growth():
+    rng = random.Random(11)
+    base_ms = 1_700_000_000_000
+    tracker = WhaleTracker(threshold_ltc=50.0, top_n=3, window_seconds=60)
+    buf = tracker._buffer
+    reference = []  # [txid, timestamp_ms, value] in arrival order
+    grew = compacted = False
+    now = base_ms
+    next_id = 0
+    for step in range(400):
+        # Bursts push the live count past 64; quiet stretches let the window drain.
+        now += rng.choice([1_000, 1_000, 5_000]) if (step // 100) % 2 == 0 else rng.choice([7_000, 13_000])
+        for _ in range(rng.randint(0, 3)):
+            values, full = buf._values, buf._end == len(buf._values)
+            live = {txid for txid, _, _ in reference}
+            value = rng.uniform(50.0, 500.0)
+            if live and rng.random() < 0.3:
+                txid = rng.choice(sorted(live))
+                tracker.process_mempool_tx(_mk_tx(txid, value), seen_ms=now)
+                row = next(r for r in reference if r[0] == txid)
+                row[2] = max(row[2], value)
+            else:
+                txid = f"tx{next_id}"
+                next_id += 1
+                tracker.process_mempool_tx(_mk_tx(txid, value), seen_ms=now)
+                reference.append([txid, now, value])
+            if full:
+                grew |= len(buf._values) > len(values)
+                compacted |= buf._values is values
+        cutoff = (now // 1000) * 1000 - 60_000
+        while reference and reference[0][1] < cutoff:
+            reference.pop(0)
+
+        metrics = tracker.tick(now)
+        vals = [v for _, _, v in reference]
+        assert metrics["whale_tx_count_10m"] == len(vals)
+        assert metrics["whale_total_value_ltc_10m"] == pytest.approx(sum(vals))
+        assert metrics["whale_max_value_ltc_10m"] == pytest.approx(max(vals, default=0.0))
+        assert metrics["whale_topN_sum_ltc_10m"] == pytest.approx(sum(sorted(vals)[-3:]))
+        assert list(buf.values()) == pytest.approx(vals)
+
+    assert grew and compacted
+    assert len(buf._values) > 64
@@ -1,10 +1,23 @@
-import json, sys
+import mmap, sys
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # stdlib fallback when orjson is not installed
+    import json
+
+    def _loads(buf):
+        return json.loads(bytes(buf))
+
+
+def _load_json(path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return _loads(view)
 
 def main():
     path = "ai_attestation.json"
     try:
-        with open(path,"r",encoding="utf-8") as f:
-            obj = json.load(f)
+        obj = _load_json(path)
     except Exception as e:
         print(f"FAIL: cannot read {path}: {e}", file=sys.stderr); sys.exit(3)
 
@@ -1,13 +1,76 @@
-import sys, yaml, pandas as pd
+import sys, yaml
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from multiai.tools.jit import njit
+except ImportError:  # CI runs this script without installing the package
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# LibYAML-backed loader when PyYAML was built with it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+@njit(cache=True, error_model="numpy")
+def _backtest_kernel(r_arr, w_arr):
+    # One pass with running equity/peak/drawdown; no intermediate arrays.
+    equity = 1.0
+    peak = -np.inf
+    pos = 0.0
+    neg = 0.0
+    max_dd = 0.0
+    for i in range(r_arr.shape[0]):
+        x = r_arr[i] * w_arr[i]
+        equity *= 1.0 + x
+        if x > 0.0:
+            pos += x
+        elif x < 0.0:
+            neg -= x
+        if equity > peak:
+            peak = equity
+        dd = (peak - equity) / peak
+        if dd > max_dd:
+            max_dd = dd
+    pf = pos / max(1e-9, neg) if neg != 0.0 else np.inf
+    return pf, max_dd
 
 def simple_backtest(df, ret_col="ret_1s", weight_col="kelly_weight_h60"):
     # naive equity curve
-    r = df[ret_col].fillna(0.0).values * df.get(weight_col, 0.0).fillna(0.0).values
-    equity = (1.0 + r).cumprod()
-    pf = (r[r>0].sum() / max(1e-9, -r[r<0].sum())) if (r[r<0].sum()!=0) else np.inf
-    peak = np.maximum.accumulate(equity)
-    mdd = float(((peak - equity)/peak).max()) if len(equity)>0 else 0.0
+    r = df[ret_col].fillna(0.0).to_numpy(dtype=np.float64)
+    w = df[weight_col].fillna(0.0).to_numpy(dtype=np.float64) if weight_col in df.columns else np.zeros(len(r))
+    pf, mdd = _backtest_kernel(r, w)
+    return float(pf), float(mdd)
+
+def _read_arrays(path, columns):
+    """Row count plus the requested columns (those present) as NumPy arrays, via Arrow.
+
+    Timestamps come back as int64 nanoseconds and float nulls as NaN; no
+    pandas frame is built.
+    """
+    pf = pq.ParquetFile(path)
+    present = [c for c in columns if c in pf.schema_arrow.names]
+    table = pf.read(columns=present)
+    out = {}
+    for name in present:
+        col = table.column(name)
+        if pa.types.is_timestamp(col.type):
+            col = col.cast(pa.timestamp("ns", tz=col.type.tz))
+            out[name] = col.cast(pa.int64()).to_numpy()
+        else:
+            out[name] = col.to_numpy().astype(np.float64, copy=False)
+    return table.num_rows, out
+
+def aligned_backtest(f_ts, r, p_ts, w=None):
+    """Backtest on timestamps common to both sides without building a merged frame.
+
+    Rows are matched with ``np.intersect1d`` on the int64 timestamps (unique
+    stamps, ascending order) and only the two needed columns are gathered.
+    """
+    _, fi, pi = np.intersect1d(f_ts, p_ts, return_indices=True)
+    r = np.nan_to_num(r[fi], nan=0.0)
+    w = np.nan_to_num(w[pi], nan=0.0) if w is not None else np.zeros(len(r))
+    pf, mdd = _backtest_kernel(r, w)
     return float(pf), float(mdd)
 
 def main():
@@ -16,19 +79,18 @@ def main():
         sys.exit(2)
     features_path, preds_path = sys.argv[1], sys.argv[2]
     with open("policies/gates.yml","r",encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+        cfg = yaml.load(f, Loader=_YAML_LOADER)
 
-    feats = pd.read_parquet(features_path)
-    preds = pd.read_parquet(preds_path)
+    f_rows, feats = _read_arrays(features_path, ("timestamp", "ret_1s"))
+    p_rows, preds = _read_arrays(preds_path, ("timestamp", "kelly_weight_h60"))
     rows_min = int(cfg["thresholds"]["rows_min"])
-    if len(feats) < rows_min or len(preds) < rows_min:
+    if f_rows < rows_min or p_rows < rows_min:
         print(f"SKIP: rows<{rows_min}, not enough data for backtest gate"); sys.exit(0)
 
-    df = feats.merge(preds, on="timestamp", how="inner")
-    if "ret_1s" not in df.columns:
+    if "ret_1s" not in feats:
         print("FAIL: ret_1s missing from features", file=sys.stderr); sys.exit(3)
 
-    pf, mdd = simple_backtest(df, "ret_1s", "kelly_weight_h60")
+    pf, mdd = aligned_backtest(feats["timestamp"], feats["ret_1s"], preds["timestamp"], preds.get("kelly_weight_h60"))
     if pf < float(cfg["thresholds"]["pf_min"]):
         print(f"FAIL: profit factor {pf:.3f} < {cfg['thresholds']['pf_min']}", file=sys.stderr); sys.exit(3)
     if mdd > float(cfg["thresholds"]["mdd_max"]):
@@ -1,4 +1,17 @@
-import sys, yaml, pandas as pd
+import sys, yaml
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# LibYAML-backed loader when PyYAML was built with it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _missing_count(col):
+    """Nulls plus float NaNs, i.e. what ``pandas.isna`` would count."""
+    missing = col.null_count
+    if pa.types.is_floating(col.type):
+        missing += pc.sum(pc.is_nan(col)).as_py() or 0
+    return missing
 
 def main():
     if len(sys.argv)<3:
@@ -6,21 +19,27 @@ def main():
         sys.exit(2)
     features_path, preds_path = sys.argv[1], sys.argv[2]
     with open("policies/gates.yml","r",encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+        cfg = yaml.load(f, Loader=_YAML_LOADER)
 
-    preds = pd.read_parquet(preds_path)
+    # Row count and column names come from the footer; only the required
+    # columns are decoded, for the coverage check.
+    pf = pq.ParquetFile(preds_path)
+    n_rows = pf.metadata.num_rows
     rows_min = int(cfg["thresholds"]["rows_min"])
-    if len(preds) < rows_min:
+    if n_rows < rows_min:
         print(f"SKIP: rows<{rows_min}, not enough data for calibration gate"); sys.exit(0)
 
-    req = cfg.get("required_pred_columns", [])
-    if missing := [c for c in req if c not in preds.columns]:
+    req = cfg.get("required_pred_columns") or []
+    names = set(pf.schema_arrow.names)
+    if missing := [c for c in req if c not in names]:
         print(f"FAIL: missing prediction columns: {missing}", file=sys.stderr); sys.exit(3)
 
-    # coverage check
-    coverage = 1.0 - (preds[req].isna().sum().sum() / (len(preds)*len(req)))
-    if coverage < float(cfg["thresholds"]["coverage_min"]):
-        print(f"FAIL: coverage {coverage:.3f} < {cfg['thresholds']['coverage_min']}", file=sys.stderr); sys.exit(3)
+    # coverage check; with no required columns there is nothing to cover
+    if req:
+        table = pf.read(columns=list(req))
+        coverage = 1.0 - (sum(_missing_count(table.column(c)) for c in req) / (n_rows*len(req)))
+        if coverage < float(cfg["thresholds"]["coverage_min"]):
+            print(f"FAIL: coverage {coverage:.3f} < {cfg['thresholds']['coverage_min']}", file=sys.stderr); sys.exit(3)
 
     print("OK: calibration gates passed"); sys.exit(0)
 
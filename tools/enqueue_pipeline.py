@@ -1,18 +1,27 @@
 
-import os, glob, time
+import os, time
 from multiai.orchestrator.queue import enqueue
 
-def _latest(path):
-    files = [p for p in glob.glob(path) if os.path.isfile(p)]
-    if not files:
+def _latest(dir_path, suffix=".parquet"):
+    """Newest regular file in ``dir_path`` ending with ``suffix`` (one scandir pass)."""
+    best, best_mtime = None, None
+    try:
+        entries = os.scandir(dir_path)
+    except (FileNotFoundError, NotADirectoryError):
         return None
-    files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-    return files[0]
+    with entries:
+        for e in entries:
+            if e.name.startswith(".") or not e.name.endswith(suffix) or not e.is_file():
+                continue
+            m = e.stat().st_mtime
+            if best_mtime is None or m > best_mtime:
+                best, best_mtime = e.path, m
+    return best
 
 def main():
     repo = os.getcwd()
-    off = _latest(os.path.join(repo, "data", "offchain", "*.parquet"))
-    on = _latest(os.path.join(repo, "data", "onchain", "*.parquet"))
+    off = _latest(os.path.join(repo, "data", "offchain"))
+    on = _latest(os.path.join(repo, "data", "onchain"))
     if not off or not on:
         print("missing parquet files under data/offchain or data/onchain")
         return
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import argparse
+import mmap
+import os
 import pathlib
+import re
 import sys
 from typing import Iterable
 
@@ -11,16 +14,28 @@ class MathValidationError(RuntimeError):
 
 
 _SUSPICIOUS_TOKENS = ("TODO", "nan", "div0", "??")
+# All tokens in one case-insensitive alternation, so a file is scanned once
+# (stopping at the first hit) instead of once per token.
+_SUSPICIOUS_RE = re.compile(
+    b"|".join(re.escape(token.encode("ascii")) for token in _SUSPICIOUS_TOKENS), re.IGNORECASE
+)
+_TOKEN_BY_FOLDED = {token.lower(): token for token in _SUSPICIOUS_TOKENS}
 
 
 def _validate_file(path: pathlib.Path) -> None:
-    if not path.exists():
-        raise MathValidationError(f"missing file: {path}")
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    lowered = text.lower()
-    for token in _SUSPICIOUS_TOKENS:
-        if token.lower() in lowered:
-            raise MathValidationError(f"math validation failed: token '{token}' in {path}")
+    try:
+        fh = path.open("rb")
+    except (FileNotFoundError, NotADirectoryError):
+        raise MathValidationError(f"missing file: {path}") from None
+    with fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            match = _SUSPICIOUS_RE.search(mm)
+            hit = match.group().decode("ascii").lower() if match is not None else None
+    if hit is not None:
+        token = _TOKEN_BY_FOLDED[hit]
+        raise MathValidationError(f"math validation failed: token '{token}' in {path}")
 
 
 def _validate(paths: Iterable[str]) -> None:
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
+import re
 import sys
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+
+_CHUNK_CHARS = 65536
 
 
 class PolicyViolation(RuntimeError):
@@ -36,9 +42,24 @@ def _load_policy(path: str) -> List[str]:
     return blocked or list(_DEFAULT_BLOCKED)
 
 
+@functools.lru_cache(maxsize=8)
+def _policy_pattern(terms: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """One alternation over every (lowercased) blocked term, or ``None`` if all are blank."""
+    needles = {term.lower().strip() for term in terms}
+    needles.discard("")
+    if not needles:
+        return None
+    return re.compile("|".join(re.escape(needle) for needle in needles))
+
+
 def _enforce(prompt: str, blocked_terms: Iterable[str]) -> None:
+    terms = tuple(blocked_terms)
     lowered = prompt.lower()
-    for term in blocked_terms:
+    pattern = _policy_pattern(terms)
+    if pattern is None or pattern.search(lowered) is None:
+        return
+    # Report the first violated term in policy order, as before.
+    for term in terms:
         term_lower = term.lower().strip()
         if not term_lower:
             continue
@@ -46,19 +67,40 @@ def _enforce(prompt: str, blocked_terms: Iterable[str]) -> None:
             raise PolicyViolation(f"blocked term detected: {term}")
 
 
+def _enforce_stream(chunks: Iterable[str], blocked_terms: Iterable[str]) -> None:
+    """Like :func:`_enforce` over a chunked prompt, stopping at the first violating chunk.
+
+    Each chunk is scanned together with a carried tail one character shorter
+    than the longest term, so matches spanning chunk boundaries are found.
+    """
+    terms = tuple(blocked_terms)
+    pattern = _policy_pattern(terms)
+    if pattern is None:
+        return
+    keep = max(len(term.lower().strip()) for term in terms) - 1
+    carry = ""
+    for chunk in chunks:
+        window = carry + chunk.lower()
+        if pattern.search(window) is not None:
+            _enforce(window, terms)
+        carry = window[-keep:] if keep > 0 else ""
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run Llama Guard policy checks")
     parser.add_argument("--policy", required=True, help="Path to guard policy file")
     args = parser.parse_args()
 
-    prompt = sys.stdin.read()
-    if not prompt.strip():
+    chunks = iter(functools.partial(sys.stdin.read, _CHUNK_CHARS), "")
+    # Leading whitespace-only chunks cannot hold a (stripped) term; skip them.
+    first = next((chunk for chunk in chunks if chunk.strip()), None)
+    if first is None:
         print("llama_guard: empty prompt supplied", file=sys.stderr)
         raise SystemExit(2)
 
     try:
         blocked_terms = _load_policy(args.policy)
-        _enforce(prompt, blocked_terms)
+        _enforce_stream(itertools.chain((first,), chunks), blocked_terms)
     except PolicyViolation as exc:
         print(f"llama_guard: policy violation - {exc}", file=sys.stderr)
         raise SystemExit(3)
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import mmap
+import os
+import re
 import sys
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+import yaml
+
+
+# LibYAML-backed loader when PyYAML was built with it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class ProtocolViolation(RuntimeError):
@@ -16,46 +26,68 @@ _KEYWORD_MAP: Dict[str, Tuple[str, ...]] = {
 }
 
 
+def _collect_denied(node: object, prefix: Tuple[str, ...], denied: List[str]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            _collect_denied(value, prefix + (str(key),), denied)
+    elif isinstance(node, str) and prefix and "deny" in node.lower():
+        denied.append(".".join(prefix))
+
+
 def _load_denied_capabilities(path: str) -> List[str]:
-    denied: List[str] = []
-    stack: List[Tuple[int, str]] = []
+    """Dotted paths of every mapping value in the rules YAML that says ``deny``."""
     with open(path, "r", encoding="utf-8") as handle:
-        for raw_line in handle:
-            if not raw_line.strip() or raw_line.lstrip().startswith("#"):
-                continue
-            indent = len(raw_line) - len(raw_line.lstrip(" "))
-            stripped = raw_line.strip()
-            if ":" not in stripped:
-                continue
-            key, value = stripped.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-            while stack and stack[-1][0] >= indent:
-                stack.pop()
-            if not value:
-                stack.append((indent, key))
-                continue
-            if "deny" in value.lower():
-                path_components = [frame[1] for frame in stack] + [key]
-                denied.append(".".join(path_components))
+        data = yaml.load(handle, Loader=_YAML_LOADER)
+    denied: List[str] = []
+    _collect_denied(data, (), denied)
     return denied
 
 
+_POLICY_THRESHOLDS_RE = re.compile(b"thresholds", re.IGNORECASE)
+
+
+def _policy_has_thresholds(path: str) -> bool:
+    # Case-insensitive search over the raw bytes; the file is never decoded or copied.
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _POLICY_THRESHOLDS_RE.search(mm) is not None
+
+
+@functools.lru_cache(maxsize=32)
+def _denied_keyword_pattern(denied: FrozenSet[str]) -> Tuple[Optional[Pattern[str]], Dict[str, str]]:
+    """One alternation over the keywords of every denied capability, plus keyword -> capability."""
+    owner: Dict[str, str] = {}
+    for capability in sorted(denied):
+        for kw in _KEYWORD_MAP.get(capability, ()):
+            owner.setdefault(kw, capability)
+    if not owner:
+        return None, owner
+    # Longest first, so a keyword is never shadowed by one of its prefixes.
+    # ASCII case folding keeps every match's .lower() equal to its keyword.
+    alternation = "|".join(re.escape(kw) for kw in sorted(owner, key=len, reverse=True))
+    return re.compile(alternation, re.IGNORECASE | re.ASCII), owner
+
+
+_THRESHOLD_RE = re.compile("threshold", re.IGNORECASE | re.ASCII)
+
+
 def _enforce(prompt: str, policy_path: str, rules_path: str) -> None:
-    denied = set(_load_denied_capabilities(rules_path))
+    denied = frozenset(_load_denied_capabilities(rules_path))
     if not denied:
         return
-    lowered = prompt.lower()
-    for capability in denied:
-        keywords = _KEYWORD_MAP.get(capability, ())
-        for kw in keywords:
-            if kw in lowered:
-                raise ProtocolViolation(
-                    f"capability '{capability}' is denied but keyword '{kw}' was requested"
-                )
+    # Case-insensitive patterns scan the prompt as-is; no lowercased copy.
+    pattern, owner = _denied_keyword_pattern(denied)
+    hit = pattern.search(prompt) if pattern is not None else None
+    if hit is not None:
+        kw = hit.group().lower()
+        raise ProtocolViolation(
+            f"capability '{owner[kw]}' is denied but keyword '{kw}' was requested"
+        )
     # Basic policy sanity: require mention of policy identifier to ensure context.
-    policy_text = open(policy_path, "r", encoding="utf-8").read().lower()
-    if "thresholds" in policy_text and "threshold" not in lowered:
+    has_thresholds = _policy_has_thresholds(policy_path)
+    if has_thresholds and _THRESHOLD_RE.search(prompt) is None:
         raise ProtocolViolation("prompt missing acknowledgement of gate thresholds")
 
 
@@ -1,18 +1,125 @@
-import json, hashlib, os, sys, time
+import argparse, json, hashlib, mmap, os, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+# Files at least this large are hashed from a sequentially-advised mmap.
+MMAP_MIN_BYTES = 16 * 1024 * 1024
+
+# Read size for files that cannot be mapped (pipes, some network filesystems).
+READ_CHUNK_BYTES = 4 * 1024 * 1024
+
+# One read buffer per hashing thread, reused across files.
+_tls = threading.local()
+
+def _read_buffer():
+    view = getattr(_tls, "view", None)
+    if view is None:
+        view = _tls.view = memoryview(bytearray(READ_CHUNK_BYTES))
+    return view
+
+def _update_chunked(h, f):
+    # readinto the thread's 4 MiB buffer: few Python-level iterations, no per-file allocation.
+    view = _read_buffer()
+    while n := f.readinto(view):
+        h.update(view[:n])
+
+def _update_mapped(h, f):
+    # One update over the whole mapping; MADV_SEQUENTIAL (where the platform
+    # has it) lets the kernel read ahead aggressively for the linear scan.
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        _update_chunked(h, f)
+        return
+    with mm:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        h.update(mm)
 
 def sha256_file(path):
-    h = hashlib.sha256()
+    # The whole file goes to OpenSSL without a Python read loop: small files
+    # via file_digest (3.11+, loops in C), large ones (or on 3.10) via mmap.
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            h.update(chunk)
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_BYTES and hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        if size:
+            _update_mapped(h, f)
+        return h.hexdigest()
+
+def xxh3_file(path):
+    # Non-cryptographic identity digest; needs the optional ``xxhash`` package.
+    import xxhash
+
+    h = xxhash.xxh3_128()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            _update_mapped(h, f)
     return h.hexdigest()
 
-def main():
+CACHE_PATH = ".provenance_cache.json"
+
+def _load_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _save_cache(path, cache):
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_provenance_", dir=os.path.dirname(path) or ".", text=True)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _cache_key(path, algo):
+    # A rewrite normally changes mtime_ns or size, but an edit that preserves
+    # both is not detected; hence the cache is opt-in (--cache).
+    st = os.stat(path)
+    return f"{algo}|{os.path.realpath(path)}|{st.st_mtime_ns}|{st.st_size}"
+
+def _file_entry(path, algo, digest):
+    # sha256 keeps the original {"path", "sha256"} shape for existing verifiers.
+    if algo == "sha256":
+        return {"path": path, "sha256": digest}
+    return {"path": path, "algo": "xxh3_128", "digest": digest}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Emit ai_attestation.json for key repo files")
+    ap.add_argument("--algo", choices=("sha256", "xxh3"), default="sha256",
+                    help="file digest: sha256 (default) or xxh3 (xxHash3-128, non-cryptographic)")
+    ap.add_argument("--cache", action="store_true",
+                    help=f"reuse digests from {CACHE_PATH} for files whose mtime and size are unchanged; "
+                         "trusts that file, so leave it off when the attestation must reflect the bytes on disk")
+    args = ap.parse_args(argv)
+    if args.algo == "xxh3":
+        try:
+            import xxhash  # noqa: F401
+        except ImportError:
+            print("--algo xxh3 requires the 'xxhash' package", file=sys.stderr); sys.exit(2)
+
     # Emit ai_attestation.json in CWD summarizing key files if they exist
-    files = []
-    for p in ["core_protocol.md","policies/rules.yml","policies/gates.yml","src/multiai/cli.py"]:
-        if os.path.exists(p):
-            files.append({"path": p, "sha256": sha256_file(p)})
+    existing = [p for p in ["core_protocol.md","policies/rules.yml","policies/gates.yml","src/multiai/cli.py"] if os.path.exists(p)]
+    cache = _load_cache(CACHE_PATH) if args.cache else {}
+    keys = [_cache_key(p, args.algo) for p in existing]
+    missing = [(p, k) for p, k in zip(existing, keys) if k not in cache]
+    if missing:
+        # hashlib releases the GIL while digesting, so files hash in parallel.
+        digest_file = sha256_file if args.algo == "sha256" else xxh3_file
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as ex:
+            for (_, k), digest in zip(missing, ex.map(digest_file, [p for p, _ in missing])):
+                cache[k] = digest
+    files = [_file_entry(p, args.algo, cache[k]) for p, k in zip(existing, keys)]
+    if args.cache:
+        # Keep only entries for the current files so the cache does not grow.
+        live = {k: cache[k] for k in keys}
+        if missing or len(live) != len(cache):
+            _save_cache(CACHE_PATH, live)
     att = {
         "timestamp": int(time.time()),
         "files": files,
@@ -1,13 +1,30 @@
 
-from multiai.orchestrator.queue import enqueue, dequeue, length
+import argparse
+
+from multiai.orchestrator.queue import enqueue, enqueue_many, dequeue, drain, length
 
 def main():
-    print("[smoke] initial length:", length())
-    rec = enqueue("hello", {"note": "smoke-test"})
-    print("[smoke] enqueued:", rec)
+    ap = argparse.ArgumentParser(description="Smoke-test the task queue")
+    ap.add_argument("--n", type=int, default=1, help="tasks to push and pop (batched when > 1)")
+    args = ap.parse_args()
+
+    initial = length()
+    print("[smoke] initial length:", initial)
+    if args.n <= 1:
+        rec = enqueue("hello", {"note": "smoke-test"})
+        print("[smoke] enqueued:", rec)
+        print("[smoke] length after enqueue:", length())
+        got = dequeue()
+        print("[smoke] dequeued:", got)
+        print("[smoke] length after dequeue:", length())
+        return
+
+    recs = enqueue_many(("hello", {"note": "smoke-test", "i": i}) for i in range(args.n))
+    print(f"[smoke] enqueued {len(recs)} in one batch")
     print("[smoke] length after enqueue:", length())
-    got = dequeue()
-    print("[smoke] dequeued:", got)
+    # Drain only an otherwise-empty queue so pre-existing tasks are not swallowed.
+    got = drain() if initial == 0 else [dequeue() for _ in range(args.n)]
+    print(f"[smoke] dequeued {len(got)}")
     print("[smoke] length after dequeue:", length())
 
 if __name__ == "__main__":